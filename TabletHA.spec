@@ -28,6 +28,9 @@ added_files = [
 # Collect MediaPipe data files
 added_files += collect_data_files('mediapipe')
 
+# Collect OpenCV Haar cascades (opencv_haar_face backend)
+added_files += collect_data_files('cv2', subdir='data')
+
 # Additional binaries (DLLs)
 added_binaries = []
 
@@ -0,0 +1,70 @@
+import time
+from collections import deque
+from detector_backends import Detection
+
+
+class ApproachTracker:
+    """
+    Spots a person walking towards the camera from bounding-box growth over time.
+
+    Box areas are tracked per backend, since face and body boxes of the same person
+    differ in size. A person is approaching when the newest box is at least `growth`
+    times larger than the smallest box seen in the last `window` seconds.
+    """
+
+    def __init__(self, growth: float = 1.3, window: float = 3.0, min_samples: int = 2,
+                 cooldown: float = 5.0):
+        """
+        Initialize the tracker.
+
+        Args:
+            growth: Factor by which the box area must grow within the window
+            window: Seconds of detections that are compared
+            min_samples: Detections needed in the window before growth is judged
+            cooldown: Minimum seconds between two approach events
+        """
+        self.growth = growth
+        self.window = window
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.last_growth = 1.0
+        self.events = 0
+
+        self._history = {}
+        self._last_event_time = 0.0
+
+    def reset(self):
+        """Forget all tracked boxes (e.g. after the camera was reopened)."""
+        self._history.clear()
+        self.last_growth = 1.0
+
+    def update(self, detection: Detection) -> bool:
+        """
+        Add a detection.
+
+        Args:
+            detection: Detection with a normalized (x, y, width, height) box
+
+        Returns:
+            True if the person is approaching (at most once per cooldown period)
+        """
+        now = time.time()
+        _, _, width, height = detection.bbox
+        area = width * height
+
+        history = self._history.setdefault(detection.backend, deque())
+        history.append((now, area))
+        while now - history[0][0] > self.window:
+            history.popleft()
+
+        if len(history) < self.min_samples:
+            return False
+
+        smallest = min(sample_area for _, sample_area in history)
+        self.last_growth = area / smallest if smallest > 0 else 1.0
+        if self.last_growth < self.growth or now - self._last_event_time < self.cooldown:
+            return False
+
+        self._last_event_time = now
+        self.events += 1
+        return True
@@ -0,0 +1,193 @@
+"""
+Benchmark presence detection on replayed frames.
+Runs each detection mode over a video file, an image directory or a synthetic source
+and reports per-stage timings and presence decisions. No webcam is needed.
+
+Examples:
+    python benchmark.py --source recordings/kitchen.mp4
+    python benchmark.py --source synthetic:sprite:face.jpg --modes face both --frames 200
+    python benchmark.py --source frames/ --cascade opencv_haar_face,mediapipe_pose --csv out.csv
+"""
+
+import argparse
+import csv
+import logging
+import sys
+import time
+from detector_stats import percentile
+from presence_detector import PresenceDetector
+from frame_source import create_source
+
+# Stages in report order; backend names are inserted between "convert" and "callback"
+LEADING_STAGES = ["capture", "quality", "motion", "convert"]
+TRAILING_STAGES = ["callback", "total"]
+
+
+def parse_size(value):
+    """Parse a WIDTHxHEIGHT string."""
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def run_mode(args, label, detection_mode, cascade):
+    """Replay the source through one detector configuration and collect results."""
+    width, height = args.capture_size
+    source = create_source(args.source, width, height, fps=args.fps)
+    if not source.open():
+        print(f"❌ Could not open source: {args.source}")
+        return None
+
+    detector = PresenceDetector(
+        detection_confidence=args.confidence,
+        detection_mode=detection_mode,
+        detection_cascade=cascade,
+        motion_gate_enabled=not args.no_motion_gate,
+        adaptive_sampling=False,
+        inference_isolation=args.isolation,
+        inference_size=args.inference_size,
+        roi_tracking=not args.no_roi,
+        min_dwell=args.dwell,
+        camera_source=source
+    )
+    detector.add_callback(lambda present: None)
+    warm_up_start = time.perf_counter()
+    if not detector.load_models():
+        print("❌ Could not load detector models")
+        source.release()
+        return None
+    warm_up = time.perf_counter() - warm_up_start
+
+    samples = {}
+    decisions = []
+    inference_runs = 0
+    detections = 0
+    changes = 0
+    started = time.perf_counter()
+
+    try:
+        for index in range(args.frames):
+            frame_start = time.perf_counter()
+            if not source.grab():
+                break
+            ok, frame = source.retrieve()
+            if not ok:
+                break
+            capture_time = time.perf_counter() - frame_start
+
+            previous = detector.person_present
+            detection = detector.process_frame(frame, time.time(), capture_time)
+            timings = dict(detector.last_timings)
+            timings["total"] = time.perf_counter() - frame_start
+
+            for stage, seconds in timings.items():
+                samples.setdefault(stage, []).append(seconds)
+
+            ran_inference = "convert" in timings
+            inference_runs += ran_inference
+            detections += detection is not None
+            changes += detector.person_present != previous
+            decisions.append({
+                "frame": index,
+                "inference": int(ran_inference),
+                "backend": detection.backend if detection else "",
+                "confidence": f"{detection.confidence:.3f}" if detection else "",
+                "present": int(detector.person_present),
+            })
+    finally:
+        elapsed = time.perf_counter() - started
+        detector.close()
+        source.release()
+
+    return {
+        "label": label,
+        "backends": detector.cascade.names,
+        "samples": samples,
+        "decisions": decisions,
+        "inference_runs": inference_runs,
+        "detections": detections,
+        "changes": changes,
+        "elapsed": elapsed,
+        "warm_up": warm_up,
+    }
+
+
+def print_report(result):
+    """Print per-stage timings and the presence decisions for one run."""
+    frames = len(result["decisions"])
+    print("=" * 72)
+    print(f"{result['label']}  ({' -> '.join(result['backends'])})")
+    print("=" * 72)
+    if frames == 0:
+        print("No frames processed")
+        return
+
+    print(f"{'stage':<22}{'calls':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    stages = LEADING_STAGES + result["backends"] + TRAILING_STAGES
+    for stage in stages:
+        values = sorted(result["samples"].get(stage, []))
+        if not values:
+            continue
+        mean = sum(values) / len(values)
+        print(f"{stage:<22}{len(values):>7}{mean * 1000:>10.2f}"
+              f"{percentile(values, 50) * 1000:>10.2f}{percentile(values, 95) * 1000:>10.2f}"
+              f"{values[-1] * 1000:>10.2f}")
+
+    print()
+    print(f"Frames: {frames}, inference runs: {result['inference_runs']} "
+          f"({result['inference_runs'] / frames:.0%}), detections: {result['detections']}")
+    print(f"Presence changes: {result['changes']}, final state: "
+          f"{'present' if result['decisions'][-1]['present'] else 'absent'}")
+    print(f"Throughput: {frames / result['elapsed']:.1f} frames/s "
+          f"(model load and warm-up: {result['warm_up']:.2f} s, not included)")
+    print()
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark presence detection on replayed frames")
+    parser.add_argument("--source", default="synthetic:moving",
+                        help='Video file, image directory or "synthetic[:pattern[:sprite]]"')
+    parser.add_argument("--modes", nargs="+", default=["face", "pose", "both"],
+                        help="Detection modes to run")
+    parser.add_argument("--cascade", help="Comma-separated backend list to run instead of --modes")
+    parser.add_argument("--frames", type=int, default=300, help="Maximum frames per run")
+    parser.add_argument("--fps", type=float, default=0.0, help="Replay rate (0 = as fast as possible)")
+    parser.add_argument("--confidence", type=float, default=0.5, help="Detection confidence")
+    parser.add_argument("--capture-size", type=parse_size, default=(640, 480), help="WIDTHxHEIGHT")
+    parser.add_argument("--inference-size", type=parse_size, default=None, help="WIDTHxHEIGHT")
+    parser.add_argument("--isolation", choices=["thread", "process"], default="thread")
+    parser.add_argument("--dwell", type=float, default=0.0, help="Minimum dwell in seconds")
+    parser.add_argument("--no-motion-gate", action="store_true", help="Run inference on every frame")
+    parser.add_argument("--no-roi", action="store_true", help="Disable region-of-interest tracking")
+    parser.add_argument("--csv", help="Write per-frame presence decisions to this CSV file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    if args.cascade:
+        runs = [(args.cascade, None, args.cascade.split(","))]
+    else:
+        runs = [(mode, mode, None) for mode in args.modes]
+
+    results = []
+    for label, mode, cascade in runs:
+        result = run_mode(args, label, mode or "face", cascade)
+        if result is None:
+            return 1
+        print_report(result)
+        results.append(result)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["run", "frame", "inference", "backend", "confidence", "present"])
+            writer.writeheader()
+            for result in results:
+                for decision in result["decisions"]:
+                    writer.writerow({"run": result["label"], **decision})
+        print(f"✓ Decisions written to {args.csv}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+# Easing curves: map fade progress (0.0 to 1.0) to the share of the change applied
+EASINGS = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: 1 - (1 - t) * (1 - t),
+    "ease_in_out": lambda t: t * t * (3 - 2 * t),
+}
+
+
+class Fade:
+    """A brightness change from the level at its first step to `target` over `duration` seconds."""
+
+    def __init__(self, target: int, duration: float = 0.0, easing: str = "linear"):
+        self.target = target
+        self.duration = duration
+        self.easing = EASINGS[easing]
+        self.start_level: Optional[int] = None
+        self.start_time = 0.0
+
+    def begin(self, level: int):
+        """Start the fade from the given level."""
+        self.start_level = level
+        self.start_time = time.monotonic()
+
+    def level_at(self, now: float) -> Tuple[int, bool]:
+        """
+        Get the level for a point in time.
+
+        Returns:
+            Tuple of (level, whether the fade is finished)
+        """
+        if self.start_level is None or self.duration <= 0:
+            return self.target, True
+        progress = (now - self.start_time) / self.duration
+        if progress >= 1.0:
+            return self.target, True
+        change = (self.target - self.start_level) * self.easing(progress)
+        return round(self.start_level + change), False
+
+
+class BrightnessWriter:
+    """
+    Writes brightness levels and fades on its own thread, so callers never wait for
+    the monitor.
+
+    Only one fade is kept: a new request replaces the one in flight, which then
+    continues from the level already reached. Writes are spaced at least
+    `min_interval` seconds apart and each step is computed when it is written, so
+    there is never more than one step pending. A slider drag that sends twenty levels
+    therefore results in a few writes, the last of which is the level the slider
+    stopped at.
+    """
+
+    def __init__(self, write: Callable[[int], bool], min_interval: float = 0.25,
+                 on_applied: Optional[Callable[[int], None]] = None,
+                 current_level: Optional[Callable[[], int]] = None):
+        """
+        Initialize the writer.
+
+        Args:
+            write: Function that sets the brightness and returns True if the level
+                is now on screen
+            min_interval: Minimum seconds between two writes
+            on_applied: Called with the level after a request was completely applied
+                (on the writer thread)
+            current_level: Function returning the current brightness, called on the
+                writer thread before the first step of every request; fades start from
+                it (without it they jump straight to their target)
+        """
+        self.write = write
+        self.min_interval = min_interval
+        self.on_applied = on_applied
+        self.current_level = current_level
+        self.target: Optional[int] = None
+        self.requested = 0
+        self.coalesced = 0
+        self.written = 0
+
+        self._fade: Optional[Fade] = None
+        self._last_level: Optional[int] = None
+        self._last_write_time = 0.0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the writer thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="brightness-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the writer thread; a fade still in flight is not finished."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def request(self, level: int, duration: float = 0.0, easing: str = "linear"):
+        """
+        Ask for a brightness level; returns immediately.
+
+        Args:
+            level: Brightness level (0-100), replaces any request not finished yet
+            duration: Seconds to fade over (0 = set directly)
+            easing: Easing curve of the fade, one of EASINGS
+        """
+        with self._condition:
+            self.requested += 1
+            if self._fade is not None:
+                if self._fade.target == level and duration > 0:
+                    # Already fading there; restarting would only slow the fade down
+                    return
+                self.coalesced += 1
+            self.target = level
+            self._fade = Fade(level, duration, easing)
+            self._condition.notify()
+
+    def get_stats(self) -> dict:
+        """Get the number of requested, coalesced and written levels."""
+        return {
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "written": self.written,
+        }
+
+    def _run(self):
+        """Writer loop."""
+        while True:
+            with self._condition:
+                while self._running and self._fade is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+
+                # Requests arriving while we wait replace the fade
+                delay = self._last_write_time + self.min_interval - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                fade = self._fade
+
+            if fade.start_level is None and self.current_level:
+                fade.begin(self.current_level())
+            level, finished = fade.level_at(time.monotonic())
+
+            with self._condition:
+                if self._fade is not fade:
+                    continue
+                if finished:
+                    self._fade = None
+
+            if not finished and level in (self._last_level, fade.start_level):
+                # The eased curve has not moved a whole step yet
+                self._last_write_time = time.monotonic()
+                continue
+
+            try:
+                applied = self.write(level)
+                self._last_level = level
+                self._last_write_time = time.monotonic()
+                self.written += 1
+                if finished and applied and self.on_applied:
+                    self.on_applied(level)
+            except Exception as e:
+                logging.error(f"Error writing brightness: {e}", exc_info=True)
@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+from detector_stats import RollingStats
+
+
+class CallbackDispatcher:
+    """
+    Delivers notifications on a dedicated thread so slow consumers never stall detection.
+
+    Notifications are queued by key. When a notification for a key is still pending, a
+    newer one replaces it (latest state wins), so a slow consumer skips intermediate
+    states instead of falling further behind. If the queue is full, the oldest pending
+    notification is dropped.
+    """
+
+    def __init__(self, name: str = "callbacks", max_pending: int = 8):
+        """
+        Initialize the dispatcher. The delivery thread starts on the first submit().
+
+        Args:
+            name: Thread name, used in logs
+            max_pending: Maximum number of queued notifications (distinct keys)
+        """
+        self.name = name
+        self.max_pending = max_pending
+        self.dispatched = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.latency = RollingStats()
+
+        self._pending: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._delivered = {}
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def submit(self, key: Hashable, handler: Callable[[Any], None], value: Any):
+        """
+        Queue handler(value) for delivery. Never blocks on the handler.
+
+        Args:
+            key: Notifications with the same key coalesce; only the newest is delivered
+            handler: Function called on the dispatcher thread
+            value: Argument passed to the handler
+        """
+        with self._condition:
+            if key in self._pending:
+                self.coalesced += 1
+                del self._pending[key]
+                if self._delivered.get(key, object()) == value:
+                    # The consumer already has this state; the pending change was undone
+                    return
+            elif len(self._pending) >= self.max_pending:
+                dropped_key, _ = self._pending.popitem(last=False)
+                self.dropped += 1
+                logging.warning(f"{self.name}: queue full, dropped pending '{dropped_key}' notification")
+
+            self._pending[key] = (handler, value, time.perf_counter())
+            self._ensure_thread()
+            self._condition.notify()
+
+    def stop(self, timeout: float = 2.0):
+        """
+        Deliver what is still queued, then stop the delivery thread.
+
+        Args:
+            timeout: Seconds to wait for pending notifications to be delivered
+        """
+        with self._condition:
+            thread = self._thread
+            self._stopping = True
+            self._condition.notify()
+        if thread:
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                logging.warning(f"{self.name}: a callback is still running, not waiting for it")
+        with self._condition:
+            self._stopping = False
+            self._thread = None
+
+    def get_stats(self) -> dict:
+        """Get the delivery counters and the queueing latency summary."""
+        with self._condition:
+            return {
+                "dispatched": self.dispatched,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "pending": len(self._pending),
+                "latency": self.latency.summary(),
+            }
+
+    def _ensure_thread(self):
+        """Start the delivery thread if it is not running. Caller holds the lock."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Delivery loop; drains the queue before exiting on stop()."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                key, (handler, value, queued_at) = self._pending.popitem(last=False)
+                self._delivered[key] = value
+                self.latency.add(time.perf_counter() - queued_at)
+                self.dispatched += 1
+
+            try:
+                handler(value)
+            except Exception as e:
+                logging.error(f"{self.name}: error delivering '{key}' notification: {e}", exc_info=True)
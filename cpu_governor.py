@@ -0,0 +1,149 @@
+import cv2
+import logging
+import os
+import psutil
+import threading
+import time
+from typing import Callable, Iterable, Optional, Set
+
+
+def limit_threads(opencv_threads: int = 0, cores: int = 0):
+    """
+    Limit the thread pools of the current process.
+
+    Args:
+        opencv_threads: Size of OpenCV's thread pool (0 = OpenCV default)
+        cores: Pin the process to this many CPU cores, so libraries that size their own
+            pools from the core count (MediaPipe/TFLite) stay within them (0 = all cores)
+    """
+    if opencv_threads > 0:
+        cv2.setNumThreads(opencv_threads)
+        logging.info(f"OpenCV limited to {opencv_threads} thread(s)")
+
+    if cores > 0:
+        try:
+            process = psutil.Process()
+            available = process.cpu_affinity()
+            # Use the last cores; the UI and the web renderer tend to start on the first
+            process.cpu_affinity(available[-cores:])
+            logging.info(f"Process {process.pid} pinned to CPU cores {available[-cores:]}")
+        except (AttributeError, psutil.Error, OSError) as e:
+            logging.warning(f"Could not set CPU affinity: {e}")
+
+
+def native_thread_ids() -> Set[int]:
+    """
+    Ids of the current process's threads that were not started from Python.
+
+    These are the thread pools of native libraries (MediaPipe's graph executor,
+    TFLite/XNNPACK, OpenCV's parallel_for_); comparing the set before and after a
+    library is first used tells which threads it started.
+    """
+    try:
+        all_ids = {thread.id for thread in psutil.Process().threads()}
+    except (psutil.Error, OSError) as e:
+        logging.debug(f"Could not list threads: {e}")
+        return set()
+    return all_ids - {thread.native_id for thread in threading.enumerate()}
+
+
+def thread_cpu_time(thread_ids: Iterable[int]) -> float:
+    """
+    CPU seconds used so far by some threads of the current process.
+
+    Args:
+        thread_ids: Native thread ids (threading.get_native_id() / Thread.native_id)
+
+    Returns:
+        User plus system time of those threads that are still alive
+    """
+    wanted = set(thread_ids)
+    try:
+        return sum(thread.user_time + thread.system_time
+                   for thread in psutil.Process().threads() if thread.id in wanted)
+    except (psutil.Error, OSError) as e:
+        logging.debug(f"Could not read thread CPU times: {e}")
+        return 0.0
+
+
+class CpuGovernor:
+    """
+    Keeps detection within a CPU budget by stretching the sampling interval.
+
+    Every `sample_period` seconds the CPU time used by the detector is compared with the
+    wall time across all cores. While that share exceeds `budget`, check intervals are
+    stretched (up to `max_stretch` times); once usage is well below budget they relax
+    back to normal.
+    """
+
+    def __init__(self, cpu_time: Callable[[], float], budget: float = 0.3,
+                 sample_period: float = 5.0, max_stretch: float = 4.0,
+                 cpu_count: Optional[int] = None):
+        """
+        Initialize the governor.
+
+        Args:
+            cpu_time: Function returning the cumulative CPU seconds used by the detector
+            budget: Allowed share of the total CPU (0.0 to 1.0, all cores together)
+            sample_period: Seconds between CPU measurements
+            max_stretch: Maximum factor the interval is stretched by
+            cpu_count: Number of cores, defaults to os.cpu_count()
+        """
+        self.cpu_time = cpu_time
+        self.budget = budget
+        self.sample_period = sample_period
+        self.max_stretch = max_stretch
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.cpu_share = 0.0
+        self.stretch = 1.0
+        self.throttling = False
+
+        self._last_sample = None
+
+    def reset(self):
+        """Start a new measurement, e.g. after detection was paused."""
+        self._last_sample = None
+
+    def update(self) -> bool:
+        """
+        Measure CPU usage if a sample period has passed and adjust the stretch factor.
+
+        Returns:
+            True if the throttling state changed
+        """
+        now = time.monotonic()
+        if self._last_sample is not None and now - self._last_sample[0] < self.sample_period:
+            return False
+
+        # Measured only once per sample period; reading thread times is not free
+        cpu = self.cpu_time()
+        if self._last_sample is None:
+            self._last_sample = (now, cpu)
+            return False
+        last_wall, last_cpu = self._last_sample
+        self._last_sample = (now, cpu)
+
+        # A restarted thread or worker process resets its CPU counter; treat that as no usage
+        self.cpu_share = max(0.0, cpu - last_cpu) / ((now - last_wall) * self.cpu_count)
+        if self.cpu_share > self.budget:
+            self.stretch = min(self.max_stretch, self.stretch * self.cpu_share / self.budget)
+        elif self.cpu_share < self.budget * 0.8:
+            self.stretch = max(1.0, self.stretch * 0.8)
+
+        throttling = self.stretch > 1.0
+        changed = throttling != self.throttling
+        self.throttling = throttling
+        return changed
+
+    def apply(self, interval: float) -> float:
+        """Stretch a check interval according to the current CPU usage."""
+        return interval * self.stretch
+
+    def get_state(self) -> dict:
+        """Get the current CPU share, budget, stretch factor and throttling state."""
+        return {
+            "throttling": self.throttling,
+            "cpu_share": self.cpu_share,
+            "budget": self.budget,
+            "stretch": self.stretch,
+        }
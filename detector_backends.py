@@ -0,0 +1,315 @@
+import cv2
+import logging
+import numpy as np
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type
+
+
+class Detection(NamedTuple):
+    """A positive detection result."""
+    backend: str
+    confidence: float
+    bbox: Tuple[float, float, float, float]  # (x, y, width, height), normalized to 0.0-1.0
+
+
+class DetectorBackend:
+    """
+    Base class for person detectors.
+
+    Subclasses set `name` and `cost` (relative per-frame cost, lower is cheaper) and
+    implement `load()` and `detect()`. All backends receive RGB frames.
+    """
+
+    name = ""
+    cost = 1.0
+
+    def __init__(self, confidence: float = 0.5, **options):
+        self.confidence = confidence
+        self.options = options
+
+    def load(self):
+        """Build the underlying model. Raises if the backend cannot be used."""
+
+    def detect(self, rgb_frame: np.ndarray) -> Optional[Detection]:
+        """Return the best detection in the frame, or None."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the underlying model."""
+
+
+BACKENDS: Dict[str, Type[DetectorBackend]] = {}
+
+# Detection modes are cascades of backend names; they are run cheapest first
+DETECTION_MODES: Dict[str, List[str]] = {
+    "face": ["mediapipe_face"],
+    "pose": ["mediapipe_pose"],
+    "both": ["mediapipe_face", "mediapipe_pose"],
+}
+
+
+def register_backend(backend_class: Type[DetectorBackend]) -> Type[DetectorBackend]:
+    """Class decorator that makes a backend available by name."""
+    BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+
+def backends_for_mode(detection_mode: str) -> List[str]:
+    """Return the backend names for a named detection mode ("face", "pose" or "both")."""
+    if detection_mode not in DETECTION_MODES:
+        raise ValueError(f"Unknown detection mode: {detection_mode}")
+    return DETECTION_MODES[detection_mode]
+
+
+def sort_by_cost(backend_names: List[str]) -> List[str]:
+    """Validate backend names and return them cheapest first."""
+    unknown = [name for name in backend_names if name not in BACKENDS]
+    if unknown:
+        raise ValueError(f"Unknown detector backend(s): {', '.join(unknown)}")
+    return sorted(backend_names, key=lambda name: BACKENDS[name].cost)
+
+
+def _normalized_bbox(x: float, y: float, w: float, h: float,
+                     frame_width: int, frame_height: int) -> Tuple[float, float, float, float]:
+    """Convert a pixel bounding box to normalized coordinates."""
+    return (x / frame_width, y / frame_height, w / frame_width, h / frame_height)
+
+
+@register_backend
+class MediaPipeFaceBackend(DetectorBackend):
+    """MediaPipe BlazeFace short-range face detector."""
+
+    name = "mediapipe_face"
+    cost = 1.0
+
+    def load(self):
+        # Imported here: importing MediaPipe takes most of the model load time, and
+        # load() runs on the detection thread (or in the inference worker process)
+        import mediapipe as mp
+        self._model = mp.solutions.face_detection.FaceDetection(
+            model_selection=self.options.get("model_selection", 0),  # 0 for short range (2m), 1 for full range (5m)
+            min_detection_confidence=self.confidence
+        )
+
+    def detect(self, rgb_frame: np.ndarray) -> Optional[Detection]:
+        results = self._model.process(rgb_frame)
+        if not results.detections:
+            return None
+
+        best = max(results.detections, key=lambda d: d.score[0])
+        box = best.location_data.relative_bounding_box
+        return Detection(self.name, best.score[0], (box.xmin, box.ymin, box.width, box.height))
+
+    def close(self):
+        self._model.close()
+
+
+@register_backend
+class MediaPipePoseBackend(DetectorBackend):
+    """MediaPipe BlazePose (lite) body detector."""
+
+    name = "mediapipe_pose"
+    cost = 8.0
+
+    def load(self):
+        import mediapipe as mp
+        self._pose = mp.solutions.pose
+        self._model = self._pose.Pose(
+            static_image_mode=False,
+            model_complexity=self.options.get("model_complexity", 0),  # 0=lite, 1=full, 2=heavy
+            min_detection_confidence=self.confidence,
+            min_tracking_confidence=self.confidence
+        )
+
+    def detect(self, rgb_frame: np.ndarray) -> Optional[Detection]:
+        results = self._model.process(rgb_frame)
+        if not results.pose_landmarks:
+            return None
+
+        # Check key body landmarks for visibility (shoulders and hips)
+        landmarks = results.pose_landmarks.landmark
+        key_landmarks = [
+            landmarks[self._pose.PoseLandmark.LEFT_SHOULDER],
+            landmarks[self._pose.PoseLandmark.RIGHT_SHOULDER],
+            landmarks[self._pose.PoseLandmark.LEFT_HIP],
+            landmarks[self._pose.PoseLandmark.RIGHT_HIP],
+        ]
+
+        # Require at least 2 key landmarks visible with good confidence
+        visible = [lm for lm in key_landmarks if lm.visibility > self.confidence]
+        if len(visible) < 2:
+            return None
+
+        # Bounding box around every landmark MediaPipe considers visible
+        points = [lm for lm in landmarks if lm.visibility > self.confidence] or visible
+        xs = [min(max(lm.x, 0.0), 1.0) for lm in points]
+        ys = [min(max(lm.y, 0.0), 1.0) for lm in points]
+        confidence = sum(lm.visibility for lm in visible) / len(visible)
+        return Detection(self.name, confidence, (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)))
+
+    def close(self):
+        self._model.close()
+
+
+@register_backend
+class HaarFaceBackend(DetectorBackend):
+    """OpenCV Haar cascade frontal face detector (very cheap, less accurate)."""
+
+    name = "opencv_haar_face"
+    cost = 0.5
+
+    def load(self):
+        path = self.options.get("cascade_path") or os.path.join(
+            cv2.data.haarcascades, "haarcascade_frontalface_default.xml"
+        )
+        self._model = cv2.CascadeClassifier(path)
+        if self._model.empty():
+            raise FileNotFoundError(f"Could not load Haar cascade from {path}")
+
+    def detect(self, rgb_frame: np.ndarray) -> Optional[Detection]:
+        gray = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY)
+        faces = self._model.detectMultiScale(
+            gray,
+            scaleFactor=self.options.get("scale_factor", 1.1),
+            minNeighbors=self.options.get("min_neighbors", 5),
+            minSize=(30, 30)
+        )
+        if len(faces) == 0:
+            return None
+
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        height, width = gray.shape[:2]
+        return Detection(self.name, 1.0, _normalized_bbox(x, y, w, h, width, height))
+
+
+@register_backend
+class HogPersonBackend(DetectorBackend):
+    """OpenCV HOG + linear SVM pedestrian detector (expensive, no model files needed)."""
+
+    name = "opencv_hog_person"
+    cost = 15.0
+
+    def load(self):
+        self._model = cv2.HOGDescriptor()
+        self._model.setSVMDetector(cv2.HOGDescriptor.getDefaultPeopleDetector())
+
+    def detect(self, rgb_frame: np.ndarray) -> Optional[Detection]:
+        rects, weights = self._model.detectMultiScale(
+            rgb_frame,
+            winStride=(8, 8),
+            padding=(8, 8),
+            scale=self.options.get("scale", 1.05)
+        )
+        if len(rects) == 0:
+            return None
+
+        best = int(np.argmax(weights))
+        score = float(np.ravel(weights)[best])
+        if score < self.confidence:
+            return None
+
+        x, y, w, h = rects[best]
+        height, width = rgb_frame.shape[:2]
+        return Detection(self.name, score, _normalized_bbox(x, y, w, h, width, height))
+
+
+@register_backend
+class DnnFaceBackend(DetectorBackend):
+    """
+    OpenCV DNN face detector (e.g. the res10 300x300 SSD Caffe model).
+
+    Requires `model` and `config` options pointing at the model files.
+    """
+
+    name = "opencv_dnn_face"
+    cost = 4.0
+
+    def load(self):
+        model = self.options.get("model", "")
+        config = self.options.get("config", "")
+        if not model or not os.path.exists(model):
+            raise FileNotFoundError(f"DNN face model not found: '{model}'")
+
+        self._model = cv2.dnn.readNet(model, config)
+        self._input_size = tuple(self.options.get("input_size", (300, 300)))
+
+    def detect(self, rgb_frame: np.ndarray) -> Optional[Detection]:
+        # The reference model was trained on BGR input with these channel means
+        blob = cv2.dnn.blobFromImage(rgb_frame, 1.0, self._input_size, (104.0, 177.0, 123.0), swapRB=True)
+        self._model.setInput(blob)
+        output = self._model.forward()
+
+        detections = output.reshape(-1, 7)
+        if len(detections) == 0:
+            return None
+
+        best = detections[np.argmax(detections[:, 2])]
+        if best[2] < self.confidence:
+            return None
+
+        x1, y1, x2, y2 = np.clip(best[3:7], 0.0, 1.0)
+        return Detection(self.name, float(best[2]), (float(x1), float(y1), float(x2 - x1), float(y2 - y1)))
+
+
+class DetectorCascade:
+    """Runs backends cheapest first and stops at the first positive result."""
+
+    def __init__(self, backend_names: List[str], confidence: float = 0.5,
+                 backend_options: Optional[Dict[str, dict]] = None):
+        """
+        Initialize the cascade.
+
+        Args:
+            backend_names: Names of registered backends to run
+            confidence: Minimum confidence for a detection (0.0 to 1.0)
+            backend_options: Optional per-backend options, keyed by backend name
+        """
+        backend_options = backend_options or {}
+        self.backends: List[DetectorBackend] = [
+            BACKENDS[name](confidence, **backend_options.get(name, {}))
+            for name in sort_by_cost(backend_names)
+        ]
+        # The backends that loaded; every load() retries all configured ones
+        self._loaded: List[DetectorBackend] = []
+        # Seconds spent in each backend during the last detect() call
+        self.last_timings: Dict[str, float] = {}
+
+    @property
+    def names(self) -> List[str]:
+        """Backend names in the order they run (the configured ones until loaded)."""
+        return [backend.name for backend in self._loaded or self.backends]
+
+    def load(self):
+        """Load every configured backend, skipping the ones that fail."""
+        self._loaded = []
+        for backend in self.backends:
+            try:
+                backend.load()
+                self._loaded.append(backend)
+            except Exception as e:
+                logging.error(f"Could not load detector backend '{backend.name}': {e}")
+
+        if not self._loaded:
+            raise RuntimeError("No detector backend could be loaded")
+        logging.info(f"Detector cascade: {' -> '.join(self.names)}")
+
+    def detect(self, rgb_frame: np.ndarray) -> Optional[Detection]:
+        """Return the first positive detection, or None if no backend found anyone."""
+        self.last_timings = {}
+        for backend in self._loaded:
+            start_time = time.perf_counter()
+            detection = backend.detect(rgb_frame)
+            self.last_timings[backend.name] = time.perf_counter() - start_time
+            if detection is not None:
+                return detection
+        return None
+
+    def close(self):
+        """Release all loaded backends."""
+        for backend in self._loaded:
+            try:
+                backend.close()
+            except Exception as e:
+                logging.warning(f"Error closing detector backend '{backend.name}': {e}")
+        self._loaded = []
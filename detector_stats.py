@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+# Upper bucket edges (ms) of the latency histograms; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class RollingStats:
+    """Keeps the most recent samples of one measurement and summarises them on demand."""
+
+    def __init__(self, window: int = 300):
+        """
+        Initialize the rolling window.
+
+        Args:
+            window: Number of most recent samples kept
+        """
+        self.total = 0
+        self._samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        """Add one sample in seconds."""
+        self._samples.append(seconds)
+        self.total += 1
+
+    def summary(self) -> dict:
+        """
+        Summarise the samples in the window.
+
+        Returns:
+            Dict with the total sample count, the window count, mean/p50/p95/p99/max in
+            milliseconds and a histogram of sample counts per bucket
+        """
+        values = sorted(self._samples)
+        summary = {"total": self.total, "count": len(values)}
+        if not values:
+            return summary
+
+        summary["mean_ms"] = sum(values) / len(values) * 1000
+        for pct in (50, 95, 99):
+            summary[f"p{pct}_ms"] = percentile(values, pct) * 1000
+        summary["max_ms"] = values[-1] * 1000
+
+        histogram = {}
+        index = 0
+        for edge in HISTOGRAM_BUCKETS_MS:
+            start = index
+            while index < len(values) and values[index] * 1000 <= edge:
+                index += 1
+            histogram[f"<={edge}"] = index - start
+        histogram[f">{HISTOGRAM_BUCKETS_MS[-1]}"] = len(values) - index
+        summary["histogram_ms"] = histogram
+        return summary
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 if it is empty)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class DetectorStats:
+    """
+    Thread-safe runtime statistics for the detection loop.
+
+    The detection thread records each iteration; any thread (e.g. the UI) may read a
+    snapshot. Recording only appends to bounded deques, and percentiles are computed
+    when a snapshot is taken.
+    """
+
+    def __init__(self, window: int = 300):
+        """
+        Initialize the statistics.
+
+        Args:
+            window: Number of most recent loop iterations the rolling figures cover
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all samples and counters."""
+        with self._lock:
+            self._stages: Dict[str, RollingStats] = {}
+            self._loop = RollingStats(self.window)
+            self._frame_times = deque(maxlen=self.window)
+            self._inference_times = deque(maxlen=self.window)
+            self.frames_analysed = 0
+            self.inference_skipped = 0
+            self.frames_missed = 0
+
+    def record_frame(self, timings: Dict[str, float], loop_time: float, inference_ran: bool):
+        """
+        Record one analysed frame.
+
+        Args:
+            timings: Seconds per stage (capture, quality, motion, convert, <backend>, callback)
+            loop_time: Seconds from the start of the iteration until detection finished
+            inference_ran: False if inference was skipped for this frame (no motion, or
+                an unusable image)
+        """
+        now = time.time()
+        with self._lock:
+            for stage, seconds in timings.items():
+                stats = self._stages.get(stage)
+                if stats is None:
+                    stats = self._stages[stage] = RollingStats(self.window)
+                stats.add(seconds)
+            self._loop.add(loop_time)
+            self._frame_times.append(now)
+            self.frames_analysed += 1
+            if inference_ran:
+                self._inference_times.append(now)
+            else:
+                self.inference_skipped += 1
+
+    def record_missed_frame(self):
+        """Record an iteration where the camera delivered no new frame in time."""
+        with self._lock:
+            self.frames_missed += 1
+
+    def snapshot(self) -> dict:
+        """
+        Get a consistent copy of the current statistics.
+
+        Returns:
+            Dict with per-stage and loop summaries, effective FPS and frame counters
+        """
+        with self._lock:
+            return {
+                "stages": {stage: stats.summary() for stage, stats in self._stages.items()},
+                "loop": self._loop.summary(),
+                "fps": _rate(self._frame_times),
+                "inference_fps": _rate(self._inference_times),
+                "frames_analysed": self.frames_analysed,
+                "inference_skipped": self.inference_skipped,
+                "frames_missed": self.frames_missed,
+            }
+
+
+def _rate(timestamps: deque) -> Optional[float]:
+    """Events per second over a window of timestamps, or None with fewer than two."""
+    if len(timestamps) < 2 or timestamps[-1] <= timestamps[0]:
+        return None
+    return (len(timestamps) - 1) / (timestamps[-1] - timestamps[0])
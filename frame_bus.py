@@ -0,0 +1,225 @@
+"""
+Shared-memory ring buffer that lets other local processes read the camera frames
+the presence detector captures, without opening the camera or decoding again.
+
+Layout: a 64-byte bus header followed by `slots` slots, each a 64-byte slot header
+and room for one frame. Every slot is guarded by a sequence lock: the writer makes
+the lock odd while it copies a frame in and even again when done, so a reader that
+sees the same even value before and after reading knows the frame is consistent.
+
+Example reader:
+    reader = FrameBusReader()
+    bus_frame = reader.wait_for_frame(timeout=1.0)
+    if bus_frame:
+        process(bus_frame.frame)   # a view into shared memory
+        if not reader.is_valid(bus_frame):
+            ...                    # overwritten meanwhile, discard the result
+    reader.close()
+"""
+
+import logging
+import numpy as np
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional
+
+DEFAULT_BUS_NAME = "tablet-ha-frames"
+
+MAGIC = b"THFB"
+VERSION = 1
+# magic, version, slot count, bytes per slot, sequence number of the newest frame
+BUS_HEADER = struct.Struct("<4sIIIQ")
+# lock, frame sequence number, timestamp, height, width, channels
+SLOT_HEADER = struct.Struct("<QQdIII")
+HEADER_SIZE = 64
+
+
+class BusFrame(NamedTuple):
+    """A frame read from the bus."""
+    sequence: int
+    timestamp: float
+    frame: np.ndarray
+    lock: int
+
+
+class FrameBusWriter:
+    """Publishes frames into the shared-memory ring buffer (one writer per bus)."""
+
+    def __init__(self, max_frame_bytes: int, name: str = DEFAULT_BUS_NAME, slots: int = 4):
+        """
+        Create the shared-memory block.
+
+        Args:
+            max_frame_bytes: Largest frame (height * width * channels) that can be published
+            name: Shared-memory name readers attach to
+            slots: Number of frames kept; a zero-copy view stays valid for slots - 1
+                newer frames
+        """
+        self.name = name
+        self.slots = slots
+        self.slot_bytes = max_frame_bytes
+        self.sequence = 0
+        self._warned_size = False
+
+        size = HEADER_SIZE + slots * (HEADER_SIZE + max_frame_bytes)
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a crashed run (on Windows it would belong to a live process)
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self._buf = self._shm.buf
+        for slot in range(slots):
+            SLOT_HEADER.pack_into(self._buf, self._slot_offset(slot), 0, 0, 0.0, 0, 0, 0)
+        BUS_HEADER.pack_into(self._buf, 0, MAGIC, VERSION, slots, max_frame_bytes, 0)
+        logging.info(f"Frame bus '{name}' created ({slots} slots of {max_frame_bytes // 1024} KiB)")
+
+    def write(self, frame: np.ndarray, timestamp: float) -> bool:
+        """
+        Publish a frame.
+
+        Args:
+            frame: uint8 image (height x width or height x width x channels)
+            timestamp: When the frame was captured (time.time())
+
+        Returns:
+            False if the bus is closed or the frame does not fit in a slot
+        """
+        if self._buf is None:
+            return False
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_bytes:
+            if not self._warned_size:
+                logging.warning(f"Frame {frame.shape} does not fit on the frame bus, not publishing")
+                self._warned_size = True
+            return False
+
+        sequence = self.sequence + 1
+        offset = self._slot_offset(sequence % self.slots)
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+
+        lock = SLOT_HEADER.unpack_from(self._buf, offset)[0]
+        # Odd lock: readers ignore the slot while it is being written
+        struct.pack_into("<Q", self._buf, offset, lock + 1)
+        target = np.ndarray(frame.shape, dtype=np.uint8, buffer=self._buf, offset=offset + HEADER_SIZE)
+        np.copyto(target, frame)
+        SLOT_HEADER.pack_into(self._buf, offset, lock + 1, sequence, timestamp, height, width, channels)
+        struct.pack_into("<Q", self._buf, offset, lock + 2)
+
+        BUS_HEADER.pack_into(self._buf, 0, MAGIC, VERSION, self.slots, self.slot_bytes, sequence)
+        self.sequence = sequence
+        return True
+
+    def close(self):
+        """Remove the bus; attached readers keep their mapping until they close."""
+        self._buf = None
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _slot_offset(self, slot: int) -> int:
+        return HEADER_SIZE + slot * (HEADER_SIZE + self.slot_bytes)
+
+
+class FrameBusReader:
+    """Reads frames from a bus created by FrameBusWriter, in another process."""
+
+    def __init__(self, name: str = DEFAULT_BUS_NAME):
+        """
+        Attach to an existing bus.
+
+        Args:
+            name: Shared-memory name of the bus
+
+        Raises:
+            FileNotFoundError: If no bus with this name exists
+            ValueError: If the block is not a frame bus of a supported version
+        """
+        self._shm = shared_memory.SharedMemory(name=name)
+        if os.name != "nt":
+            # Attaching registers the block for cleanup when this process exits, which
+            # would remove the writer's bus; only the writer may unlink it
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        self._buf = self._shm.buf
+        magic, version, self.slots, self.slot_bytes, _ = BUS_HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"'{name}' is not a version {VERSION} frame bus")
+        self.last_sequence = 0
+
+    def latest(self, copy: bool = False, retries: int = 3) -> Optional[BusFrame]:
+        """
+        Read the newest frame.
+
+        Args:
+            copy: Return a private copy instead of a view into shared memory
+            retries: Attempts when the writer replaces the frame while it is read
+
+        Returns:
+            The newest frame, or None if nothing was published yet (or the writer
+            kept overwriting it)
+        """
+        for _ in range(retries):
+            sequence = BUS_HEADER.unpack_from(self._buf, 0)[4]
+            if sequence == 0:
+                return None
+
+            offset = self._slot_offset(sequence % self.slots)
+            lock, slot_sequence, timestamp, height, width, channels = SLOT_HEADER.unpack_from(self._buf, offset)
+            if lock % 2 or slot_sequence != sequence:
+                continue
+
+            shape = (height, width) if channels == 1 else (height, width, channels)
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=self._buf, offset=offset + HEADER_SIZE)
+            if copy:
+                frame = frame.copy()
+
+            if SLOT_HEADER.unpack_from(self._buf, offset)[0] == lock:
+                self.last_sequence = sequence
+                return BusFrame(sequence, timestamp, frame, lock)
+        return None
+
+    def wait_for_frame(self, timeout: float, copy: bool = False,
+                       poll_interval: float = 0.005) -> Optional[BusFrame]:
+        """
+        Wait for a frame newer than the last one read.
+
+        Args:
+            timeout: Maximum seconds to wait
+            copy: Return a private copy instead of a view into shared memory
+            poll_interval: Seconds between checks of the bus header
+
+        Returns:
+            The new frame, or None on timeout
+        """
+        deadline = time.time() + timeout
+        while True:
+            if BUS_HEADER.unpack_from(self._buf, 0)[4] > self.last_sequence:
+                bus_frame = self.latest(copy)
+                if bus_frame:
+                    return bus_frame
+            if time.time() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def is_valid(self, bus_frame: BusFrame) -> bool:
+        """Whether a zero-copy frame has not been overwritten since it was read."""
+        offset = self._slot_offset(bus_frame.sequence % self.slots)
+        return SLOT_HEADER.unpack_from(self._buf, offset)[0] == bus_frame.lock
+
+    def close(self):
+        """Detach from the bus. Views returned by latest() must no longer be used."""
+        self._buf = None
+        self._shm.close()
+
+    def _slot_offset(self, slot: int) -> int:
+        return HEADER_SIZE + slot * (HEADER_SIZE + self.slot_bytes)
@@ -0,0 +1,218 @@
+import cv2
+import logging
+import numpy as np
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+from frame_source import FrameSource
+
+
+class LatestFrameSlot:
+    """Single-slot frame buffer: writers overwrite, readers only ever see the newest frame."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._timestamp = 0.0
+        self._sequence = 0
+        self._taken_sequence = 0
+        self._interrupted = False
+        self.frames_dropped = 0
+
+    def put(self, frame: np.ndarray, timestamp: float):
+        """Store a new frame, replacing (and dropping) any frame that was never read."""
+        with self._condition:
+            if self._sequence > self._taken_sequence:
+                self.frames_dropped += 1
+            self._frame = frame
+            self._timestamp = timestamp
+            self._sequence += 1
+            self._condition.notify_all()
+
+    def get(self, timeout: float) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Take the newest frame that has not been read yet.
+
+        Args:
+            timeout: Maximum time in seconds to wait for a new frame
+
+        Returns:
+            (frame, capture timestamp) or None if no new frame arrived in time or
+            the wait was interrupted
+        """
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: self._sequence > self._taken_sequence or self._interrupted, timeout
+            )
+            if not ready or self._interrupted:
+                self._interrupted = False
+                return None
+            self._taken_sequence = self._sequence
+            return self._frame, self._timestamp
+
+    def interrupt(self):
+        """Wake up a reader blocked in get() without a frame."""
+        with self._condition:
+            self._interrupted = True
+            self._condition.notify_all()
+
+    def clear(self):
+        """Drop the stored frame and any pending interrupt."""
+        with self._condition:
+            self._frame = None
+            self._taken_sequence = self._sequence
+            self._interrupted = False
+
+
+class CameraCapture:
+    """Reads camera frames on a dedicated thread and keeps only the newest one."""
+
+    FRESHNESS_MODES = ("latest", "buffered")
+
+    def __init__(self, source: FrameSource, freshness: str = "latest"):
+        """
+        Initialize the camera capture.
+
+        Args:
+            source: Where frames come from (a webcam, or a replay source for benchmarks)
+            freshness: How frames are pulled from the driver
+                - "latest": Shrink the driver buffer, grab() continuously without decoding
+                  and only retrieve() the frame that will actually be analysed
+                - "buffered": read() and decode every frame (for drivers where grab() misbehaves)
+        """
+        if freshness not in self.FRESHNESS_MODES:
+            raise ValueError(f"Unknown frame freshness mode: {freshness}")
+
+        self.source = source
+        self.freshness = freshness
+        self.is_running = False
+        self.camera: Optional[FrameSource] = None
+        self.frames_flushed = 0
+        self._slot = LatestFrameSlot()
+        self._frame_listeners: List[Callable[[np.ndarray, float], None]] = []
+        self._decode_requested = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def frames_dropped(self) -> int:
+        """Number of captured frames that were replaced before anyone read them."""
+        return self._slot.frames_dropped
+
+    def start(self) -> bool:
+        """
+        Open the camera and start the capture thread.
+
+        Returns:
+            True if the camera was opened
+        """
+        if self.is_running:
+            return True
+
+        if not self.source.open():
+            logging.error("Could not open camera for presence detection")
+            return False
+        self.camera = self.source
+
+        if self.freshness == "latest":
+            # Not every backend supports this; grab() flushing keeps frames fresh either way
+            if not self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                logging.debug("Camera backend does not support setting the buffer size")
+
+        self.is_running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._capture_loop, name="camera-capture", daemon=True)
+        self._thread.start()
+        return True
+
+    @property
+    def native_id(self) -> Optional[int]:
+        """Native id of the capture thread, or None while it is not running."""
+        return self._thread.native_id if self._thread else None
+
+    def stop(self):
+        """Stop the capture thread and release the camera."""
+        self.is_running = False
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+        if self.camera:
+            self.camera.release()
+            self.camera = None
+
+        self._slot.clear()
+
+    def get_frame(self, timeout: float) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Get the newest captured frame, waiting for one if none is pending.
+
+        Args:
+            timeout: Maximum time in seconds to wait
+
+        Returns:
+            (BGR frame, grab timestamp) or None if no frame arrived in time
+        """
+        if self.freshness == "latest":
+            # Ask the capture thread to decode the next grabbed frame, ignoring any leftover
+            self._slot.clear()
+            self._decode_requested.set()
+
+        return self._slot.get(timeout)
+
+    def add_frame_listener(self, listener: Callable[[np.ndarray, float], None]):
+        """
+        Add a function called on the capture thread with every decoded frame.
+
+        In "latest" mode only the frames that are analysed get decoded; in "buffered"
+        mode every camera frame is. Listeners must be quick and must not keep the frame.
+
+        Args:
+            listener: Function that takes the BGR frame and its grab timestamp
+        """
+        self._frame_listeners.append(listener)
+
+    def interrupt(self):
+        """Make a pending get_frame() call return None immediately."""
+        self._slot.interrupt()
+
+    def flush(self):
+        """Drop the pending frame (and interrupt), e.g. after a pause."""
+        self._slot.clear()
+
+    def _capture_loop(self):
+        """Continuously drain the camera so the slot always holds the newest frame."""
+        failures = 0
+
+        while self.is_running:
+            frame = None
+            if self.freshness == "latest":
+                # Dequeue without decoding; only the requested frame pays for retrieve()
+                ret = self.camera.grab()
+                grab_time = time.time()
+                if ret:
+                    if self._decode_requested.is_set():
+                        self._decode_requested.clear()
+                        ret, frame = self.camera.retrieve()
+                    else:
+                        self.frames_flushed += 1
+            else:
+                ret, frame = self.camera.read()
+                grab_time = time.time()
+
+            if not ret:
+                failures += 1
+                if failures == 1 or failures % 50 == 0:
+                    logging.warning("Could not read frame from camera")
+                self._stop_event.wait(0.1)
+                continue
+
+            failures = 0
+            if frame is not None:
+                for listener in self._frame_listeners:
+                    try:
+                        listener(frame, grab_time)
+                    except Exception as e:
+                        logging.error(f"Error in frame listener: {e}", exc_info=True)
+                self._slot.put(frame, grab_time)
@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+
+def ensure_buffer(buffer: Optional[np.ndarray], shape: Tuple[int, ...]) -> np.ndarray:
+    """Return `buffer` if it already has the given shape, otherwise a new uint8 array."""
+    if buffer is None or buffer.shape != shape:
+        return np.empty(shape, dtype=np.uint8)
+    return buffer
+
+
+class FramePreprocessor:
+    """
+    Converts camera frames to the RGB, inference-resolution input the detectors expect.
+
+    Output is written into preallocated buffers that are reused for every frame, so the
+    returned array is only valid until the next call.
+    """
+
+    def __init__(self, inference_size: Optional[Tuple[int, int]] = None):
+        """
+        Initialize the preprocessor.
+
+        Args:
+            inference_size: (width, height) to run inference at, or None for the capture resolution
+        """
+        self.inference_size = inference_size
+        self._resized: Optional[np.ndarray] = None
+        self._rgb: Optional[np.ndarray] = None
+
+    def to_rgb(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Resize (if configured) and convert a BGR frame to RGB.
+
+        Args:
+            frame: BGR frame at capture resolution
+
+        Returns:
+            RGB frame at inference resolution (a reused buffer)
+        """
+        source = frame
+        if self.inference_size:
+            width, height = self.inference_size
+            if frame.shape[:2] != (height, width):
+                self._resized = ensure_buffer(self._resized, (height, width, 3))
+                cv2.resize(frame, (width, height), dst=self._resized, interpolation=cv2.INTER_AREA)
+                source = self._resized
+
+        self._rgb = ensure_buffer(self._rgb, source.shape)
+        cv2.cvtColor(source, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
@@ -0,0 +1,275 @@
+import cv2
+import logging
+import numpy as np
+import os
+import time
+from typing import List, Optional, Tuple, Union
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class FrameSource:
+    """
+    Minimal cv2.VideoCapture-style interface that CameraCapture reads frames from.
+
+    grab() advances to the next frame (cheap), retrieve() decodes the grabbed frame.
+    Replay sources pace grab() to `fps`; an fps of 0 replays as fast as possible.
+    """
+
+    def __init__(self, fps: float = 0.0):
+        self.fps = fps
+        self._next_frame_time = 0.0
+
+    def open(self) -> bool:
+        """Open the source. Returns True on success."""
+        return True
+
+    def set(self, prop: int, value: float) -> bool:
+        """Set a capture property. Returns False if unsupported."""
+        return False
+
+    def grab(self) -> bool:
+        """Advance to the next frame without decoding it."""
+        raise NotImplementedError
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Decode the most recently grabbed frame."""
+        raise NotImplementedError
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Grab and decode the next frame."""
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self):
+        """Close the source."""
+
+    def _pace(self):
+        """Wait until the next frame is due at the configured rate."""
+        if self.fps <= 0:
+            return
+        now = time.time()
+        if self._next_frame_time > now:
+            time.sleep(self._next_frame_time - now)
+        self._next_frame_time = max(now, self._next_frame_time) + 1.0 / self.fps
+
+
+class CameraSource(FrameSource):
+    """A webcam opened through cv2.VideoCapture (paced by the camera itself)."""
+
+    def __init__(self, index: int = 0, width: int = 640, height: int = 480):
+        super().__init__()
+        self.index = index
+        self.width = width
+        self.height = height
+        self._capture: Optional[cv2.VideoCapture] = None
+
+    def open(self) -> bool:
+        self._capture = cv2.VideoCapture(self.index)
+        if not self._capture.isOpened():
+            self.release()
+            return False
+
+        # Set camera properties for faster processing
+        self._capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self._capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        return True
+
+    def set(self, prop: int, value: float) -> bool:
+        return self._capture.set(prop, value)
+
+    def grab(self) -> bool:
+        return self._capture.grab()
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self._capture.retrieve()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self._capture.read()
+
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+
+class VideoFileSource(FrameSource):
+    """Plays back a video file, optionally looping, at the file's (or a given) frame rate."""
+
+    def __init__(self, path: str, fps: Optional[float] = None, loop: bool = True):
+        """
+        Args:
+            path: Video file path
+            fps: Playback rate; None uses the file's own rate, 0 plays as fast as possible
+            loop: Rewind at the end instead of reporting end of stream
+        """
+        super().__init__(fps or 0.0)
+        self.path = path
+        self.loop = loop
+        self._use_file_fps = fps is None
+        self._capture: Optional[cv2.VideoCapture] = None
+
+    def open(self) -> bool:
+        self._capture = cv2.VideoCapture(self.path)
+        if not self._capture.isOpened():
+            self.release()
+            return False
+        if self._use_file_fps:
+            self.fps = self._capture.get(cv2.CAP_PROP_FPS) or 30.0
+        return True
+
+    def grab(self) -> bool:
+        self._pace()
+        if self._capture.grab():
+            return True
+        if not self.loop:
+            return False
+        self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return self._capture.grab()
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self._capture.retrieve()
+
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+
+class ImageDirectorySource(FrameSource):
+    """Plays back the images in a directory in name order."""
+
+    def __init__(self, path: str, fps: float = 10.0, loop: bool = True):
+        """
+        Args:
+            path: Directory containing .jpg/.png/.bmp images
+            fps: Playback rate, 0 plays as fast as possible
+            loop: Start over after the last image instead of reporting end of stream
+        """
+        super().__init__(fps)
+        self.path = path
+        self.loop = loop
+        self._files: List[str] = []
+        self._index = -1
+
+    def open(self) -> bool:
+        if not os.path.isdir(self.path):
+            return False
+        self._files = sorted(
+            os.path.join(self.path, name) for name in os.listdir(self.path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self._index = -1
+        return bool(self._files)
+
+    def grab(self) -> bool:
+        self._pace()
+        self._index += 1
+        if self._index >= len(self._files):
+            if not self.loop:
+                return False
+            self._index = 0
+        return True
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        frame = cv2.imread(self._files[self._index])
+        return frame is not None, frame
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generates frames without any input files.
+
+    Patterns:
+        - "static": A constant shaded frame with mild sensor noise (an empty room)
+        - "moving": A bright block sweeping across the frame (motion, no person)
+        - "sprite": An image (e.g. a cropped face) moving across a static background
+        - "dark": A nearly black frame (night, covered lens)
+    """
+
+    PATTERNS = ("static", "moving", "sprite", "dark")
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 15.0,
+                 pattern: str = "moving", sprite_path: Optional[str] = None, seed: int = 0):
+        super().__init__(fps)
+        if pattern not in self.PATTERNS:
+            raise ValueError(f"Unknown synthetic pattern: {pattern}")
+        self.width = width
+        self.height = height
+        self.pattern = pattern
+        self.sprite_path = sprite_path
+        self._rng = np.random.default_rng(seed)
+        self._frame_index = -1
+        if pattern == "dark":
+            self._background = np.full((height, width, 3), 6, dtype=np.uint8)
+        else:
+            # A vertical gradient, so the frame has the contrast of a real scene
+            shade = np.linspace(60, 140, height, dtype=np.uint8)
+            self._background = np.repeat(shade[:, None, None], width, axis=1).repeat(3, axis=2)
+        self._sprite: Optional[np.ndarray] = None
+
+    def open(self) -> bool:
+        self._frame_index = -1
+        if self.pattern == "sprite":
+            self._sprite = cv2.imread(self.sprite_path) if self.sprite_path else None
+            if self._sprite is None:
+                logging.error(f"Could not load sprite image: {self.sprite_path}")
+                return False
+            # Keep the sprite smaller than the frame
+            scale = min(1.0, 0.6 * self.height / self._sprite.shape[0], 0.6 * self.width / self._sprite.shape[1])
+            if scale < 1.0:
+                self._sprite = cv2.resize(self._sprite, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return True
+
+    def grab(self) -> bool:
+        self._pace()
+        self._frame_index += 1
+        return True
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        frame = self._background.copy()
+        noise = self._rng.integers(-3, 4, size=frame.shape, dtype=np.int16)
+        frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+        if self.pattern == "moving":
+            size = self.height // 4
+            x = (self._frame_index * 8) % max(1, self.width - size)
+            frame[self.height // 3:self.height // 3 + size, x:x + size] = 230
+        elif self.pattern == "sprite":
+            height, width = self._sprite.shape[:2]
+            x = (self._frame_index * 4) % max(1, self.width - width)
+            y = (self.height - height) // 2
+            frame[y:y + height, x:x + width] = self._sprite
+
+        return True, frame
+
+
+def create_source(spec: Union[int, str], width: int = 640, height: int = 480,
+                  fps: Optional[float] = None) -> FrameSource:
+    """
+    Build a frame source from a config/CLI value.
+
+    Args:
+        spec: Camera index (int or digit string), a video file, an image directory,
+            or "synthetic[:pattern[:sprite_path]]"
+        width: Capture width for cameras and synthetic frames
+        height: Capture height for cameras and synthetic frames
+        fps: Replay rate for files and synthetic sources (None = source default)
+
+    Returns:
+        The frame source (not yet opened)
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec), width, height)
+
+    if spec.startswith("synthetic"):
+        parts = spec.split(":", 2)
+        pattern = parts[1] if len(parts) > 1 else "moving"
+        sprite_path = parts[2] if len(parts) > 2 else None
+        return SyntheticSource(width, height, 15.0 if fps is None else fps, pattern, sprite_path)
+
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, 10.0 if fps is None else fps)
+
+    return VideoFileSource(spec, fps)
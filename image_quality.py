@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+from typing import Tuple
+
+
+class ImageQualityCheck:
+    """
+    Cheap check on a tiny thumbnail that a frame shows something detectors can work with.
+
+    States:
+        - "ok": Usable image
+        - "dark": Mean brightness below the threshold (night, lights off, lens covered)
+        - "blocked": Bright enough but almost uniform (lens covered or pointed at a wall)
+    """
+
+    STATES = ("ok", "dark", "blocked")
+
+    def __init__(self, min_brightness: float = 20.0, min_contrast: float = 6.0,
+                 hysteresis: float = 1.25, thumbnail_size: Tuple[int, int] = (32, 24)):
+        """
+        Initialize the check.
+
+        Args:
+            min_brightness: Minimum mean grayscale level (0-255) of a usable frame
+            min_contrast: Minimum grayscale standard deviation of a usable frame
+            hysteresis: Factor above the thresholds needed to become usable again,
+                so the state does not flap at dusk
+            thumbnail_size: (width, height) of the downscaled frame that is measured
+        """
+        self.min_brightness = min_brightness
+        self.min_contrast = min_contrast
+        self.hysteresis = hysteresis
+        self.thumbnail_size = thumbnail_size
+        self.state = "ok"
+        self.last_brightness = 0.0
+        self.last_contrast = 0.0
+        self.unusable_frames = 0
+
+        width, height = thumbnail_size
+        self._small = np.empty((height, width, 3), dtype=np.uint8)
+        self._gray = np.empty((height, width), dtype=np.uint8)
+
+    @property
+    def usable(self) -> bool:
+        """Whether the last checked frame was usable."""
+        return self.state == "ok"
+
+    def check(self, frame: np.ndarray) -> str:
+        """
+        Measure a BGR frame.
+
+        Args:
+            frame: BGR frame as returned by the camera
+
+        Returns:
+            The image state ("ok", "dark" or "blocked")
+        """
+        cv2.resize(frame, self.thumbnail_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        mean, stddev = cv2.meanStdDev(self._gray)
+        self.last_brightness = float(mean[0, 0])
+        self.last_contrast = float(stddev[0, 0])
+
+        margin = 1.0 if self.usable else self.hysteresis
+        if self.last_brightness < self.min_brightness * margin:
+            self.state = "dark"
+        elif self.last_contrast < self.min_contrast * margin:
+            self.state = "blocked"
+        else:
+            self.state = "ok"
+
+        if not self.usable:
+            self.unusable_frames += 1
+        return self.state
@@ -0,0 +1,181 @@
+import logging
+import multiprocessing
+import numpy as np
+import psutil
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+from cpu_governor import limit_threads
+from detector_backends import Detection, DetectorCascade, sort_by_cost
+
+
+def _worker_main(conn, backend_names: List[str], confidence: float,
+                 backend_options: Optional[Dict[str, dict]], threads: int = 0):
+    """Entry point of the inference process: run the cascade on frames placed in shared memory."""
+    try:
+        # Before loading, so the models size their thread pools to the allowed cores
+        limit_threads(opencv_threads=threads, cores=threads)
+        cascade = DetectorCascade(backend_names, confidence, backend_options)
+        cascade.load()
+    except Exception as e:
+        conn.send(("error", str(e)))
+        return
+
+    conn.send(("ready", cascade.names))
+
+    shm: Optional[shared_memory.SharedMemory] = None
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+
+            if message[0] == "stop":
+                break
+
+            _, shm_name, shape = message
+            try:
+                if shm is None or shm.name != shm_name:
+                    # The parent allocated a new (larger) buffer
+                    if shm is not None:
+                        shm.close()
+                    shm = shared_memory.SharedMemory(name=shm_name)
+
+                frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+                detection = cascade.detect(frame)
+                # Send plain tuples back; the frame itself never crosses the pipe
+                conn.send(("result", tuple(detection) if detection else None, cascade.last_timings))
+            except Exception as e:
+                conn.send(("error", str(e), {}))
+    finally:
+        if shm is not None:
+            shm.close()
+        cascade.close()
+
+
+class ProcessCascade:
+    """
+    Runs a DetectorCascade in a separate worker process.
+
+    Frames are copied into a shared memory block instead of being pickled, and only
+    compact detection tuples come back. Has the same interface as DetectorCascade.
+    """
+
+    def __init__(self, backend_names: List[str], confidence: float = 0.5,
+                 backend_options: Optional[Dict[str, dict]] = None, result_timeout: float = 10.0,
+                 threads: int = 0):
+        """
+        Initialize the process cascade.
+
+        Args:
+            backend_names: Names of registered backends to run
+            confidence: Minimum confidence for a detection (0.0 to 1.0)
+            backend_options: Optional per-backend options, keyed by backend name
+            result_timeout: Seconds to wait for the worker before treating it as hung
+            threads: CPU cores (and OpenCV threads) the worker may use, 0 for no limit
+        """
+        self.backend_names = sort_by_cost(backend_names)
+        self.confidence = confidence
+        self.backend_options = backend_options
+        self.result_timeout = result_timeout
+        self.threads = threads
+        self._names = self.backend_names
+        # Seconds spent in each backend (inside the worker) during the last detect() call
+        self.last_timings: Dict[str, float] = {}
+        # Always spawn: forking a process that runs Qt and camera threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+    @property
+    def names(self) -> List[str]:
+        """Backend names in the order they run."""
+        return self._names
+
+    def load(self):
+        """Start the worker process and wait until its models are loaded."""
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.backend_names, self.confidence, self.backend_options, self.threads),
+            name="inference-worker",
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+        # Model loading can take a while on slow tablets
+        if not self._conn.poll(60):
+            self.close()
+            raise RuntimeError("Inference worker did not start in time")
+
+        try:
+            status, payload = self._conn.recv()
+        except EOFError:
+            status, payload = "error", "worker exited during startup"
+        if status != "ready":
+            self.close()
+            raise RuntimeError(f"Inference worker failed to load models: {payload}")
+
+        self._names = payload
+        logging.info(f"Inference worker process started (pid {self._process.pid})")
+
+    def detect(self, rgb_frame: np.ndarray) -> Optional[Detection]:
+        """Run the cascade on a frame in the worker process."""
+        if self._process is None or not self._process.is_alive():
+            logging.warning("Inference worker is not running, restarting it")
+            self.close()
+            self.load()
+
+        if self._shm is None or self._shm.size < rgb_frame.nbytes:
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+            self._shm = shared_memory.SharedMemory(create=True, size=rgb_frame.nbytes)
+
+        shared_frame = np.ndarray(rgb_frame.shape, dtype=np.uint8, buffer=self._shm.buf)
+        np.copyto(shared_frame, rgb_frame)
+
+        self._conn.send(("detect", self._shm.name, rgb_frame.shape))
+        if not self._conn.poll(self.result_timeout):
+            # Kill it so the next call starts a fresh worker
+            self._process.terminate()
+            raise RuntimeError("Inference worker did not respond in time")
+
+        status, payload, self.last_timings = self._conn.recv()
+        if status == "error":
+            raise RuntimeError(f"Inference worker error: {payload}")
+        return Detection(*payload) if payload else None
+
+    def worker_cpu_time(self) -> float:
+        """CPU seconds used by the current worker process (0 if it is not running)."""
+        if self._process is None or not self._process.is_alive():
+            return 0.0
+        try:
+            times = psutil.Process(self._process.pid).cpu_times()
+        except psutil.Error:
+            return 0.0
+        return times.user + times.system
+
+    def close(self):
+        """Stop the worker process and free the shared memory."""
+        if self._conn is not None:
+            try:
+                self._conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            self._conn.close()
+            self._conn = None
+
+        if self._process is not None:
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
@@ -3,6 +3,7 @@ import json
 import time
 import os
 import logging
+import multiprocessing
 from pathlib import Path
 from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QMessageBox, QProgressDialog
 from PyQt6.QtWebEngineWidgets import QWebEngineView
@@ -10,8 +11,10 @@ from PyQt6.QtWebEngineCore import QWebEngineSettings, QWebEnginePage, QWebEngine
 from PyQt6.QtCore import Qt, QTimer, QUrl, pyqtSignal, QObject, QThread
 from PyQt6.QtGui import QKeySequence, QScreen, QShortcut
 from presence_detector import PresenceDetector
+from presence_history import ABSENT, PRESENT, STOPPED, PresenceHistory
 from screen_controller import ScreenController
 from mqtt_client import MQTTClient
+from snapshot_publisher import SnapshotPublisher
 from updater import UpdateManager
 
 
@@ -50,6 +53,8 @@ class SignalEmitter(QObject):
     mqtt_screen = pyqtSignal(str)
     mqtt_switch_app = pyqtSignal(str)
     mqtt_presence_detection = pyqtSignal(str)
+    detector_event = pyqtSignal(str, object)
+    screen_power_done = pyqtSignal(bool)
 
 
 class TabletApp(QMainWindow):
@@ -91,14 +96,25 @@ class TabletApp(QMainWindow):
         self.signal_emitter.mqtt_screen.connect(self._handle_screen_command_ui)
         self.signal_emitter.mqtt_switch_app.connect(self._handle_switch_app_command_ui)
         self.signal_emitter.mqtt_presence_detection.connect(self._handle_presence_detection_command_ui)
+        self.signal_emitter.screen_power_done.connect(self._on_screen_power_done)
         
         self.presence_detector = None
-        self.screen_controller = ScreenController()
+        self.presence_history = None
+        self.presence_timeout = self.config["presence_detection"]["presence_timeout_seconds"]
+        self.snapshot_publisher = None
+        self.screen_controller = ScreenController(
+            brightness_interval=self.config.get("screen", {}).get("brightness_write_interval_ms", 250) / 1000,
+            on_brightness_applied=self._on_brightness_applied,
+            brightness_refresh_interval=self.config.get("screen", {}).get("brightness_refresh_seconds", 600),
+            fade_duration=self.config.get("screen", {}).get("fade_duration_ms", 1000) / 1000,
+            fade_easing=self.config.get("screen", {}).get("fade_easing", "ease_in_out")
+        )
         self.mqtt_client = None
         self.current_app = "home_assistant"  # or "cookbook"
         self.last_presence_time = time.time()
         self.last_user_activity_time = time.time()
         self.screen_is_off = False
+        self.image_usable = True
         self.user_activity_enabled = self.config.get("screen", {}).get("wake_on_user_input", True)
         
         # Setup update manager
@@ -286,8 +302,7 @@ class TabletApp(QMainWindow):
         
         # Wake the screen
         if self.screen_is_off:
-            self.screen_controller.turn_screen_on()
-            self.screen_is_off = False
+            self._set_screen_power(True)
             
             # Also update presence time to prevent immediate timeout
             self.last_presence_time = current_time
@@ -342,35 +357,129 @@ class TabletApp(QMainWindow):
         check_interval = config["check_interval_ms"] / 1000.0
         confidence = config["detection_confidence"]
         detection_mode = config.get("detection_mode", "both")
+        capture_size = (config.get("capture_width", 640), config.get("capture_height", 480))
+        inference_size = None
+        if config.get("inference_width") and config.get("inference_height"):
+            inference_size = (config["inference_width"], config["inference_height"])
         
         self.presence_detector = PresenceDetector(
             detection_confidence=confidence,
             check_interval=check_interval,
-            detection_mode=detection_mode
+            detection_mode=detection_mode,
+            motion_gate_enabled=config.get("motion_gate_enabled", True),
+            motion_threshold=config.get("motion_threshold", 0.01),
+            motion_recheck_interval=config.get("motion_recheck_seconds", 10),
+            frame_freshness=config.get("frame_freshness", "latest"),
+            adaptive_sampling=config.get("adaptive_sampling", True),
+            min_interval=config.get("min_interval_ms", 200) / 1000.0,
+            max_interval=config.get("max_interval_ms", 3000) / 1000.0,
+            fast_sampling_duration=config.get("fast_sampling_seconds", 5),
+            idle_backoff_after=config.get("idle_backoff_seconds", 120),
+            presence_timeout=config["presence_timeout_seconds"],
+            screen_state_provider=lambda: not self.screen_is_off,
+            detection_cascade=config.get("detection_cascade"),
+            backend_options=config.get("backend_options"),
+            inference_isolation=config.get("inference_isolation", "thread"),
+            roi_tracking=config.get("roi_tracking", True),
+            roi_expand=config.get("roi_expand", 2.0),
+            roi_full_scan_every=config.get("roi_full_scan_every", 10),
+            capture_size=capture_size,
+            inference_size=inference_size,
+            vote_window=config.get("vote_window", 5),
+            enter_votes=config.get("enter_votes", 1),
+            exit_votes=config.get("exit_votes", 0),
+            min_dwell=config.get("min_dwell_seconds", 2),
+            camera_source=config.get("camera_source", 0),
+            image_check_enabled=config.get("image_check_enabled", True),
+            min_brightness=config.get("min_brightness", 20),
+            min_contrast=config.get("min_contrast", 6),
+            approach_detection=config.get("approach_detection", False),
+            approach_growth=config.get("approach_growth", 1.3),
+            approach_window=config.get("approach_window_seconds", 3),
+            approach_far_area=config.get("approach_far_area", 0.0),
+            opencv_threads=config.get("opencv_threads", 0),
+            inference_threads=config.get("inference_threads", 0),
+            cpu_budget=config.get("cpu_budget_percent", 30) / 100.0,
+            frame_bus_enabled=config.get("frame_bus_enabled", False),
+            frame_bus_name=config.get("frame_bus_name", "tablet-ha-frames"),
+            frame_bus_slots=config.get("frame_bus_slots", 4)
         )
         
         # Connect signals
         self.signal_emitter.presence_changed.connect(self._on_presence_changed)
+        self.signal_emitter.detector_event.connect(self._on_detector_event)
         
         # Add callback
         self.presence_detector.add_callback(
             lambda present: self.signal_emitter.presence_changed.emit(present)
         )
+        self.presence_detector.add_event_callback(
+            lambda event, value: self.signal_emitter.detector_event.emit(event, value)
+        )
+        
+        # Log presence transitions and learn how busy each hour of the day usually is
+        if config.get("history_enabled", True):
+            self._setup_presence_history()
         
         # Start detection
         self.presence_detector.start()
     
+    def _setup_presence_history(self):
+        """Open the presence history and start adapting the timeout to it."""
+        config = self.config["presence_detection"]
+        history_path = Path(config.get("history_file", "presence_history.bin"))
+        if not history_path.is_absolute():
+            history_path = self.app_dir / history_path
+        
+        try:
+            self.presence_history = PresenceHistory(
+                str(history_path),
+                capacity=config.get("history_capacity", 20000),
+                days=config.get("history_days", 28)
+            )
+        except OSError as e:
+            logging.error(f"Could not open presence history {history_path}: {e}")
+            return
+        self.presence_history.append(ABSENT)
+        
+        if config.get("learned_timeout", True):
+            self._update_learned_schedule()
+            self.schedule_timer = QTimer()
+            self.schedule_timer.timeout.connect(self._update_learned_schedule)
+            self.schedule_timer.start(600000)  # Every 10 minutes
+    
+    def _update_learned_schedule(self):
+        """Shorten the timeout and back off sampling sooner in hours that are usually empty."""
+        config = self.config["presence_detection"]
+        hour = time.localtime().tm_hour
+        occupancy = self.presence_history.hourly_occupancy()[hour]
+        factor = self.presence_history.activity_factor(occupancy)
+        
+        base_timeout = config["presence_timeout_seconds"]
+        min_timeout = min(config.get("min_presence_timeout_seconds", 10), base_timeout)
+        self.presence_timeout = min_timeout + (base_timeout - min_timeout) * factor
+        self.presence_detector.presence_timeout = self.presence_timeout
+        if self.presence_detector.scheduler:
+            base_backoff = config.get("idle_backoff_seconds", 120)
+            self.presence_detector.scheduler.idle_backoff_after = base_backoff * max(0.25, factor)
+        
+        if occupancy is not None:
+            logging.info(f"Hour {hour}: usually occupied {occupancy:.0%} of the time, "
+                         f"presence timeout {self.presence_timeout:.0f}s")
+    
     def _on_presence_changed(self, present: bool):
         """Handle presence change."""
         logging.info(f"Presence changed: {'Person detected' if present else 'No person detected'}")
         
+        if self.presence_history:
+            self.presence_history.append(PRESENT if present else ABSENT)
+        
         if present:
             self.last_presence_time = time.time()
             
             # Turn screen on or restore brightness
             if self.screen_is_off:
-                self.screen_controller.turn_screen_on()
-                self.screen_is_off = False
+                self._set_screen_power(True)
             elif self.config["screen"]["dim_brightness_when_no_presence"]:
                 self.screen_controller.restore_brightness()
         
@@ -379,6 +488,63 @@ class TabletApp(QMainWindow):
             status = "detected" if present else "not_detected"
             self.mqtt_client.publish_state("presence", status)
     
+    def _on_detector_event(self, event: str, value):
+        """Handle detector events other than presence changes."""
+        if event == "image_state":
+            self._on_image_state_changed(value)
+        elif event == "approaching":
+            self._on_person_approaching()
+        elif event == "cpu_governor":
+            if self.mqtt_client:
+                self.mqtt_client.publish_state("presence_cpu", value)
+        elif event == "detector_state":
+            logging.info(f"Presence detector {value}")
+            if self.mqtt_client:
+                self.mqtt_client.publish_state("presence_detector", value)
+    
+    def _on_person_approaching(self):
+        """Wake the screen before the person reaches the tablet, hiding the wake-up delay."""
+        if self.screen_is_off:
+            logging.info("Person approaching, waking screen early")
+            self._set_screen_power(True)
+            
+            # Also update presence time to prevent immediate timeout
+            self.last_presence_time = time.time()
+            
+            # Publish to MQTT
+            if self.mqtt_client:
+                self.mqtt_client.publish_state("screen_wake_reason", "approach")
+        elif self.config["screen"]["dim_brightness_when_no_presence"]:
+            self.screen_controller.restore_brightness()
+    
+    def _on_image_state_changed(self, state: str):
+        """Apply the screen policy for a camera image that is too dark or covered."""
+        usable = state == "ok"
+        policy = self.config["screen"].get("no_image_policy", "timeout")
+        logging.info(f"Camera image {'usable again' if usable else f'unusable ({state})'}, policy: {policy}")
+        
+        if usable and not self.image_usable and policy == "keep":
+            # Start the presence timeout afresh instead of letting it expire immediately
+            self.last_presence_time = time.time()
+        changed = usable != self.image_usable
+        self.image_usable = usable
+        
+        # Time without a usable image is not observed; presence stays frozen meanwhile
+        if changed and self.presence_history and self.presence_detector:
+            self.presence_history.append(self._observed_history_state())
+        
+        if not usable and policy == "off":
+            self._apply_no_presence_screen_state("No usable camera image")
+        
+        if self.mqtt_client:
+            self.mqtt_client.publish_state("camera_image", state)
+    
+    def _observed_history_state(self) -> int:
+        """Get the presence history state for now (STOPPED while the image is unusable)."""
+        if not self.image_usable:
+            return STOPPED
+        return PRESENT if self.presence_detector.person_present else ABSENT
+    
     def _check_presence_timeout(self):
         """Check if presence timeout has been reached."""
         if not self.config["presence_detection"]["enabled"]:
@@ -387,17 +553,23 @@ class TabletApp(QMainWindow):
         if not self.presence_detector:
             return
         
-        timeout = self.config["presence_detection"]["presence_timeout_seconds"]
+        # "keep": without a usable image nobody can be seen, so leave the screen as it is
+        if not self.image_usable and self.config["screen"].get("no_image_policy", "timeout") == "keep":
+            return
+        
         time_since_last = time.time() - self.last_presence_time
         
-        if time_since_last > timeout:
-            if self.config["screen"]["turn_off_when_no_presence"] and not self.screen_is_off:
-                logging.info("No presence detected for timeout period, turning screen off")
-                self.screen_controller.turn_screen_off()
-                self.screen_is_off = True
-            elif self.config["screen"]["dim_brightness_when_no_presence"]:
-                dim_level = self.config["screen"]["dim_level"]
-                self.screen_controller.dim_screen(dim_level)
+        if time_since_last > self.presence_timeout:
+            self._apply_no_presence_screen_state("No presence detected for timeout period")
+    
+    def _apply_no_presence_screen_state(self, reason: str):
+        """Turn the screen off or dim it, as configured for when nobody is present."""
+        if self.config["screen"]["turn_off_when_no_presence"] and not self.screen_is_off:
+            logging.info(f"{reason}, turning screen off")
+            self._set_screen_power(False)
+        elif self.config["screen"]["dim_brightness_when_no_presence"] and not self.screen_is_off:
+            dim_level = self.config["screen"]["dim_level"]
+            self.screen_controller.dim_screen(dim_level)
     
     def _setup_mqtt(self):
         """Setup MQTT client."""
@@ -413,37 +585,81 @@ class TabletApp(QMainWindow):
         self.mqtt_client.register_callback("presence_detection", 
                                           lambda payload: self.signal_emitter.mqtt_presence_detection.emit(payload))
         
+        # Snapshot camera entity, built from frames the presence detector captures anyway
+        if self.presence_detector and self.config["mqtt"].get("snapshot_enabled", False):
+            self._setup_snapshots()
+        
         # Connect
         self.mqtt_client.connect()
         
         # Wait a bit for connection, then publish discovery
         QTimer.singleShot(2000, self.mqtt_client.publish_discovery_config)
     
+    def _setup_snapshots(self):
+        """Publish low-rate camera snapshots over MQTT."""
+        config = self.config["mqtt"]
+        self.snapshot_publisher = SnapshotPublisher(
+            publish=lambda jpeg: self.mqtt_client.publish_state("snapshot", jpeg, retain=False),
+            period=config.get("snapshot_interval_seconds", 10),
+            width=config.get("snapshot_width", 320),
+            jpeg_quality=config.get("snapshot_quality", 70),
+            is_active=lambda: self.mqtt_client.is_connected
+        )
+        self.snapshot_publisher.start()
+        self.presence_detector.add_frame_listener(self.snapshot_publisher.offer)
+        
+        # Only toggles a flag, so it can run on the MQTT thread
+        self.mqtt_client.register_callback("snapshot", self._handle_snapshot_command)
+        # Messages published before connecting are dropped, so publish the switch state on connect
+        self.mqtt_client.add_connect_callback(
+            lambda: self.mqtt_client.publish_state(
+                "snapshot_enabled", "on" if self.snapshot_publisher.enabled else "off"
+            )
+        )
+    
+    def _handle_snapshot_command(self, payload: str):
+        """Turn camera snapshots on or off (runs on the MQTT thread)."""
+        payload = payload.lower()
+        if payload in ("on", "off"):
+            self.snapshot_publisher.set_enabled(payload == "on")
+            self.mqtt_client.publish_state("snapshot_enabled", payload)
+    
     def _handle_brightness_command_ui(self, payload: str):
         """Handle brightness command from MQTT (runs on UI thread)."""
         try:
             brightness = int(payload)
-            self.screen_controller.set_brightness(brightness)
-            
-            # Publish state
-            if self.mqtt_client:
-                self.mqtt_client.publish_state("brightness", brightness)
+            # Written on the brightness writer thread; the state is published once applied
+            self.screen_controller.request_brightness(brightness)
         except ValueError:
             logging.error(f"Invalid brightness value: {payload}")
         except Exception as e:
             logging.error(f"Error handling brightness command: {e}", exc_info=True)
     
+    def _set_screen_power(self, on: bool):
+        """Turn the screen on or off without waiting for the monitor."""
+        # Record the target state right away so input and timers see it while the change runs
+        self.screen_is_off = not on
+        self.screen_controller.request_screen_power(on, self.signal_emitter.screen_power_done.emit)
+    
+    def _on_screen_power_done(self, screen_on: bool):
+        """Publish the screen state once a power change finished (runs on UI thread)."""
+        if self.mqtt_client:
+            self.mqtt_client.publish_state("screen", "on" if screen_on else "off")
+    
+    def _on_brightness_applied(self, brightness: int):
+        """Publish a brightness level once it was applied (runs on the brightness writer thread)."""
+        if self.mqtt_client:
+            self.mqtt_client.publish_state("brightness", brightness)
+    
     def _handle_screen_command_ui(self, payload: str):
         """Handle screen command from MQTT (runs on UI thread)."""
         try:
             payload = payload.lower()
             
             if payload == "on":
-                self.screen_controller.turn_screen_on()
-                self.screen_is_off = False
+                self._set_screen_power(True)
             elif payload == "off":
-                self.screen_controller.turn_screen_off()
-                self.screen_is_off = True
+                self._set_screen_power(False)
         except Exception as e:
             logging.error(f"Error handling screen command: {e}", exc_info=True)
     
@@ -464,12 +680,21 @@ class TabletApp(QMainWindow):
         try:
             payload = payload.lower()
             
+            # Pause/resume instead of stop/start: keeps the thread and models alive and
+            # never blocks the UI thread on joining the detection thread
             if payload == "on" and self.presence_detector:
-                if not self.presence_detector.is_running:
+                if self.presence_detector.is_paused:
+                    self.presence_detector.resume()
+                elif not self.presence_detector.is_running:
                     self.presence_detector.start()
+                if self.presence_history:
+                    self.presence_history.append(self._observed_history_state())
             elif payload == "off" and self.presence_detector:
                 if self.presence_detector.is_running:
-                    self.presence_detector.stop()
+                    release_camera = self.config["presence_detection"].get("release_camera_when_off", True)
+                    self.presence_detector.pause(release_camera=release_camera)
+                if self.presence_history:
+                    self.presence_history.append(STOPPED)
         except Exception as e:
             logging.error(f"Error handling presence detection command: {e}", exc_info=True)
     def _check_for_updates(self):
@@ -598,7 +823,12 @@ class TabletApp(QMainWindow):
         
         # Stop presence detection
         if self.presence_detector:
-            self.presence_detector.stop()
+            self.presence_detector.close()
+        if self.presence_history:
+            self.presence_history.append(STOPPED)
+            self.presence_history.close()
+        if self.snapshot_publisher:
+            self.snapshot_publisher.stop()
         
         # Disconnect MQTT
         if self.mqtt_client:
@@ -637,4 +867,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for the inference worker process in the frozen executable
+    multiprocessing.freeze_support()
     main()
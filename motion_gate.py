@@ -0,0 +1,73 @@
+import cv2
+import logging
+import numpy as np
+from typing import Optional, Tuple
+
+
+class MotionGate:
+    """Cheap motion pre-stage that decides whether a frame is worth running inference on."""
+
+    def __init__(self, threshold: float = 0.01, pixel_delta: int = 25,
+                 learning_rate: float = 0.05, thumbnail_size: Tuple[int, int] = (80, 60)):
+        """
+        Initialize the motion gate.
+
+        Args:
+            threshold: Fraction of thumbnail pixels (0.0 to 1.0) that must change to count as motion
+            pixel_delta: Minimum grayscale difference for a pixel to count as changed
+            learning_rate: How quickly the background model absorbs static changes (0.0 to 1.0)
+            thumbnail_size: (width, height) of the downscaled grayscale frame that is compared
+        """
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.learning_rate = learning_rate
+        self.thumbnail_size = thumbnail_size
+        self.last_motion_fraction = 0.0
+
+        self._background: Optional[np.ndarray] = None
+        # Reused thumbnail-sized buffers so the per-frame path does not allocate
+        width, height = thumbnail_size
+        self._small = np.empty((height, width, 3), dtype=np.uint8)
+        self._gray = np.empty((height, width), dtype=np.uint8)
+        self._blurred = np.empty((height, width), dtype=np.uint8)
+        self._background_u8 = np.empty((height, width), dtype=np.uint8)
+        self._diff = np.empty((height, width), dtype=np.uint8)
+        self._mask = np.empty((height, width), dtype=np.uint8)
+
+    def reset(self):
+        """Forget the background model (e.g. after the camera was reopened)."""
+        self._background = None
+
+    def update(self, frame: np.ndarray) -> bool:
+        """
+        Feed a BGR frame into the background model.
+
+        Args:
+            frame: BGR frame as returned by the camera
+
+        Returns:
+            True if the frame differs enough from the background to be worth analysing
+        """
+        # Downscale first so the grayscale conversion and blur only touch a few thousand pixels
+        cv2.resize(frame, self.thumbnail_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        gray = cv2.GaussianBlur(self._gray, (5, 5), 0, dst=self._blurred)
+
+        if self._background is None:
+            # First frame: nothing to compare against, so always let it through
+            self._background = gray.astype(np.float32)
+            self.last_motion_fraction = 1.0
+            return True
+
+        cv2.convertScaleAbs(self._background, dst=self._background_u8)
+        cv2.absdiff(gray, self._background_u8, dst=self._diff)
+        cv2.threshold(self._diff, self.pixel_delta, 255, cv2.THRESH_BINARY, dst=self._mask)
+        self.last_motion_fraction = cv2.countNonZero(self._mask) / self._mask.size
+
+        # Slowly absorb lighting changes and objects that stay put
+        cv2.accumulateWeighted(gray, self._background, self.learning_rate)
+
+        motion = self.last_motion_fraction >= self.threshold
+        if motion:
+            logging.debug(f"Motion detected ({self.last_motion_fraction:.1%} of pixels changed)")
+        return motion
@@ -2,7 +2,7 @@ import json
 import logging
 import paho.mqtt.client as mqtt
 import threading
-from typing import Callable, Dict, Any
+from typing import Callable, Dict, Any, List
 
 
 class MQTTClient:
@@ -29,6 +29,7 @@ class MQTTClient:
         
         self.is_connected = False
         self.message_callbacks: Dict[str, Callable] = {}
+        self.connect_callbacks: List[Callable[[], None]] = []
         
         if self.username and self.password:
             self.client.username_pw_set(self.username, self.password)
@@ -62,7 +63,8 @@ class MQTTClient:
                 f"{self.topic_prefix}/command/brightness",
                 f"{self.topic_prefix}/command/screen",
                 f"{self.topic_prefix}/command/switch_app",
-                f"{self.topic_prefix}/command/presence_detection"
+                f"{self.topic_prefix}/command/presence_detection",
+                f"{self.topic_prefix}/command/snapshot"
             ]
             
             for topic in topics:
@@ -71,6 +73,13 @@ class MQTTClient:
             
             # Publish availability
             self.publish_state("availability", "online")
+            
+            # Republish state that must be known after every (re)connect
+            for callback in self.connect_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logging.error(f"Error in MQTT connect callback: {e}", exc_info=True)
         else:
             logging.error(f"Failed to connect to MQTT broker, return code: {rc}")
     
@@ -107,24 +116,36 @@ class MQTTClient:
         """
         self.message_callbacks[command_type] = callback
     
-    def publish_state(self, state_type: str, value: Any):
+    def add_connect_callback(self, callback: Callable[[], None]):
+        """
+        Register a callback run on the MQTT thread after every (re)connect.
+        
+        Args:
+            callback: Function to call, e.g. to publish state that was set before connecting
+        """
+        self.connect_callbacks.append(callback)
+    
+    def publish_state(self, state_type: str, value: Any, retain: bool = True):
         """
         Publish state to MQTT.
         
         Args:
             state_type: Type of state (e.g., 'presence', 'brightness')
-            value: Value to publish
+            value: Value to publish; bytes are sent as-is (e.g. a JPEG snapshot)
+            retain: Whether the broker keeps the last value for new subscribers
         """
         try:
             topic = f"{self.topic_prefix}/state/{state_type}"
             
             # Convert value to string
-            if isinstance(value, (dict, list)):
+            if isinstance(value, (bytes, bytearray)):
+                payload = value
+            elif isinstance(value, (dict, list)):
                 payload = json.dumps(value)
             else:
                 payload = str(value)
             
-            self.client.publish(topic, payload, retain=True)
+            self.client.publish(topic, payload, retain=retain)
         except Exception as e:
             logging.error(f"Error publishing state: {e}")
     
@@ -169,6 +190,35 @@ class MQTTClient:
                 retain=True
             )
             
+            if self.config.get("snapshot_enabled", False):
+                # Camera snapshots, plus a switch to turn them on and off
+                snapshot_config = {
+                    "name": "Tablet Camera",
+                    "topic": f"{self.topic_prefix}/state/snapshot",
+                    "device": device_info,
+                    "unique_id": "tablet_ha_snapshot"
+                }
+                self.client.publish(
+                    f"homeassistant/camera/tablet_ha/snapshot/config",
+                    json.dumps(snapshot_config),
+                    retain=True
+                )
+                
+                snapshot_switch_config = {
+                    "name": "Tablet Camera Snapshots",
+                    "state_topic": f"{self.topic_prefix}/state/snapshot_enabled",
+                    "command_topic": f"{self.topic_prefix}/command/snapshot",
+                    "payload_on": "on",
+                    "payload_off": "off",
+                    "device": device_info,
+                    "unique_id": "tablet_ha_snapshot_enabled"
+                }
+                self.client.publish(
+                    f"homeassistant/switch/tablet_ha/snapshot/config",
+                    json.dumps(snapshot_switch_config),
+                    retain=True
+                )
+            
             logging.info("Published MQTT discovery configuration")
         except Exception as e:
             logging.error(f"Error publishing discovery config: {e}")
@@ -0,0 +1,74 @@
+import logging
+import time
+from collections import deque
+
+
+class PresenceDebouncer:
+    """
+    Turns per-frame detections into a stable presence state.
+
+    Keeps the last `window` detection results and switches to present when at least
+    `enter_votes` of them are positive, and back to absent when at most `exit_votes`
+    are. A state is held for at least `min_dwell` seconds before it may change again.
+    """
+
+    def __init__(self, window: int = 5, enter_votes: int = 1, exit_votes: int = 0,
+                 min_dwell: float = 2.0):
+        """
+        Initialize the debouncer.
+
+        Args:
+            window: Number of most recent frames that vote (M)
+            enter_votes: Positive frames in the window needed to become present (N)
+            exit_votes: Become absent once the positive frames in the window drop to this many
+            min_dwell: Minimum seconds to stay in a state before switching
+        """
+        if not 0 < enter_votes <= window:
+            raise ValueError("enter_votes must be between 1 and the window size")
+        if not 0 <= exit_votes < enter_votes:
+            raise ValueError("exit_votes must be lower than enter_votes")
+
+        self.window = window
+        self.enter_votes = enter_votes
+        self.exit_votes = exit_votes
+        self.min_dwell = min_dwell
+        self.present = False
+        self.suppressed_changes = 0
+
+        self._votes = deque(maxlen=window)
+        self._changed_at = 0.0
+
+    def reset(self, present: bool = False):
+        """Clear the vote history and force a state."""
+        self._votes.clear()
+        self.present = present
+        self._changed_at = 0.0
+
+    def update(self, detected: bool) -> bool:
+        """
+        Add one frame's detection result.
+
+        Args:
+            detected: Whether a person was detected in the frame
+
+        Returns:
+            The debounced presence state
+        """
+        self._votes.append(detected)
+        positives = sum(self._votes)
+
+        if self.present:
+            wants_change = positives <= self.exit_votes
+        else:
+            wants_change = positives >= self.enter_votes
+
+        if wants_change:
+            now = time.time()
+            if now - self._changed_at >= self.min_dwell:
+                self.present = not self.present
+                self._changed_at = now
+            else:
+                self.suppressed_changes += 1
+                logging.debug(f"Presence change suppressed (dwell time not reached, {positives}/{len(self._votes)} votes)")
+
+        return self.present
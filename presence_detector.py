@@ -1,26 +1,115 @@
-import cv2
 import logging
-import mediapipe as mp
+import numpy as np
 import threading
 import time
-from typing import Callable, Optional
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from approach_tracker import ApproachTracker
+from callback_dispatcher import CallbackDispatcher
+from cpu_governor import CpuGovernor, limit_threads, native_thread_ids, thread_cpu_time
+from detector_backends import Detection, DetectorCascade, backends_for_mode
+from detector_stats import DetectorStats
+from frame_bus import DEFAULT_BUS_NAME, FrameBusWriter
+from frame_capture import CameraCapture
+from frame_source import FrameSource, create_source
+from frame_preprocessor import FramePreprocessor
+from image_quality import ImageQualityCheck
+from inference_worker import ProcessCascade
+from motion_gate import MotionGate
+from presence_debouncer import PresenceDebouncer
+from roi_tracker import RoiTracker, crop_region, to_frame_coords
+from sampling_scheduler import SamplingScheduler
 
 
 class PresenceDetector:
     """Detects human presence using webcam and person/pose detection."""
     
     def __init__(self, detection_confidence: float = 0.5, check_interval: float = 1.0, 
-                 detection_mode: str = "face"):
+                 detection_mode: str = "face", motion_gate_enabled: bool = True,
+                 motion_threshold: float = 0.01, motion_recheck_interval: float = 10.0,
+                 frame_freshness: str = "latest", adaptive_sampling: bool = True,
+                 min_interval: float = 0.2, max_interval: float = 3.0,
+                 fast_sampling_duration: float = 5.0, idle_backoff_after: float = 120.0,
+                 presence_timeout: float = 30.0,
+                 screen_state_provider: Optional[Callable[[], bool]] = None,
+                 detection_cascade: Optional[List[str]] = None,
+                 backend_options: Optional[Dict[str, dict]] = None,
+                 inference_isolation: str = "thread", roi_tracking: bool = True,
+                 roi_expand: float = 2.0, roi_full_scan_every: int = 10,
+                 capture_size: Tuple[int, int] = (640, 480),
+                 inference_size: Optional[Tuple[int, int]] = None, vote_window: int = 5,
+                 enter_votes: int = 1, exit_votes: int = 0, min_dwell: float = 2.0,
+                 camera_source: Union[int, str, FrameSource] = 0, stats_window: int = 300,
+                 image_check_enabled: bool = True, min_brightness: float = 20.0,
+                 min_contrast: float = 6.0, approach_detection: bool = False,
+                 approach_growth: float = 1.3, approach_window: float = 3.0,
+                 approach_far_area: float = 0.0, opencv_threads: int = 0, inference_threads: int = 0, cpu_budget: float = 0.3,
+                 frame_bus_enabled: bool = False, frame_bus_name: str = DEFAULT_BUS_NAME,
+                 frame_bus_slots: int = 4):
         """
         Initialize the presence detector.
         
         Args:
             detection_confidence: Minimum confidence for detection (0.0 to 1.0)
-            check_interval: Time between checks in seconds
+            check_interval: Normal time between checks in seconds
             detection_mode: Detection mode - "face", "pose", or "both"
                 - "face": Detect faces only (best for looking at tablet)
                 - "pose": Detect people/body pose (best for nearby presence)
-                - "both": Detect either face or pose (most sensitive)
+                - "both": Detect either face or pose (most sensitive); pose only runs
+                  when no face was found
+            motion_gate_enabled: Skip inference on frames without motion
+            motion_threshold: Fraction of pixels that must change to count as motion
+            motion_recheck_interval: Seconds after which inference runs even without motion,
+                so a person standing still is re-confirmed
+            frame_freshness: "latest" to flush the driver buffer with grab() and only decode
+                the analysed frame, or "buffered" to read() and decode every frame
+            adaptive_sampling: Vary the check interval with activity instead of using a fixed rate
+            min_interval: Fastest time between checks in seconds (after motion, presence
+                changes, or shortly before the presence timeout)
+            max_interval: Slowest time between checks in seconds after long empty periods
+            fast_sampling_duration: Seconds to stay at the fast rate after motion or a presence change
+            idle_backoff_after: Seconds without presence before backing off towards max_interval
+            presence_timeout: Seconds without presence after which the app turns the screen off
+            screen_state_provider: Function returning True while the screen is on
+            detection_cascade: Explicit list of detector backends to use instead of
+                detection_mode (see detector_backends.BACKENDS); run cheapest first
+            backend_options: Optional per-backend options, keyed by backend name
+            inference_isolation: "thread" to run inference in the detection thread, or
+                "process" to run it in a separate worker process fed through shared memory
+            roi_tracking: After a detection, scan an enlarged crop around it first
+            roi_expand: Factor by which the last bounding box is enlarged for the crop
+            roi_full_scan_every: Force a full-frame scan after this many crop scans
+            capture_size: (width, height) requested from the camera
+            inference_size: (width, height) frames are resized to before inference,
+                or None to infer at the capture resolution
+            vote_window: Number of most recent analysed frames that vote on presence (M)
+            enter_votes: Positive frames in the window needed to report presence (N)
+            exit_votes: Report absence once positive frames in the window drop to this many
+            min_dwell: Minimum seconds between presence state changes
+            camera_source: Camera index, a video file / image directory / "synthetic[:pattern]"
+                to replay instead of a webcam, or a FrameSource
+            stats_window: Number of recent loop iterations covered by get_stats()
+            image_check_enabled: Skip inference on frames that are too dark or featureless
+                (night, covered lens) and report them as an image state instead of "no person"
+            min_brightness: Minimum mean grayscale level (0-255) of a usable frame
+            min_contrast: Minimum grayscale standard deviation of a usable frame
+            approach_detection: Emit an "approaching" event when detections grow quickly
+                (someone walking towards the tablet) and sample faster for a while. Needs
+                enter_votes > 1 or approach_far_area > 0, otherwise it stays disabled
+            approach_growth: Factor by which the bounding-box area must grow to count
+            approach_window: Seconds over which the bounding-box growth is measured
+            approach_far_area: Detections whose box covers less than this share of the
+                frame count as someone far away while approach detection is on: they are
+                tracked for approach but do not vote for presence or absence
+            opencv_threads: Size of OpenCV's thread pool in this process (0 = OpenCV default)
+            inference_threads: CPU cores the inference worker may use (0 = all); only
+                applies with inference_isolation "process"
+            cpu_budget: Share of the total CPU (0.0 to 1.0) detection may use before the
+                check interval is stretched; 0 disables the governor
+            frame_bus_enabled: Publish captured frames on a shared-memory ring buffer that
+                other local processes can read (see frame_bus.FrameBusReader)
+            frame_bus_name: Shared-memory name of the frame bus
+            frame_bus_slots: Number of frames the frame bus keeps
         """
         self.detection_confidence = detection_confidence
         self.check_interval = check_interval
@@ -28,31 +117,88 @@ class PresenceDetector:
         self.is_running = False
         self.person_present = False
         self.last_detection_time = 0
+        self.last_frame_age = 0.0
+        # Seconds spent per stage (capture, quality, motion, convert, <backend>, callback) for the last frame
+        self.last_timings: Dict[str, float] = {}
+        self.stats = DetectorStats(window=stats_window)
+        self.motion_recheck_interval = motion_recheck_interval
+        self.image_check = ImageQualityCheck(min_brightness, min_contrast) if image_check_enabled else None
+        self.image_state = "ok"
+        self.motion_gate = MotionGate(threshold=motion_threshold) if motion_gate_enabled else None
+        self._last_inference_time = 0
+        self.debouncer = PresenceDebouncer(
+            window=vote_window,
+            enter_votes=enter_votes,
+            exit_votes=exit_votes,
+            min_dwell=min_dwell
+        )
+        self.presence_timeout = presence_timeout
+        self.screen_state_provider = screen_state_provider
+        if adaptive_sampling:
+            self.scheduler = SamplingScheduler(
+                base_interval=check_interval,
+                min_interval=min_interval,
+                max_interval=max_interval,
+                fast_duration=fast_sampling_duration,
+                idle_backoff_after=idle_backoff_after
+            )
+        else:
+            self.scheduler = None
         self._thread: Optional[threading.Thread] = None
         self._callbacks = []
+        self._event_callbacks = []
+        # Callbacks run on their own thread so a slow consumer cannot delay the next frame
+        self.dispatcher = CallbackDispatcher(name="presence-callbacks")
         
-        # Initialize MediaPipe detectors based on mode
-        if detection_mode in ["face", "both"]:
-            self.mp_face_detection = mp.solutions.face_detection
-            self.face_detection = self.mp_face_detection.FaceDetection(
-                model_selection=0,  # 0 for short range (2m), 1 for full range (5m)
-                min_detection_confidence=detection_confidence
-            )
-        else:
-            self.face_detection = None
-        
-        if detection_mode in ["pose", "both"]:
-            self.mp_pose = mp.solutions.pose
-            self.pose_detection = self.mp_pose.Pose(
-                static_image_mode=False,
-                model_complexity=0,  # 0=lite, 1=full, 2=heavy
-                min_detection_confidence=detection_confidence,
-                min_tracking_confidence=detection_confidence
-            )
+        # Set to end the detection loop; _wake_event interrupts waits on pause/resume/stop
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._paused = False
+        self._release_camera_on_pause = False
+        self._warming = False
+        self._models_loaded = False
+        self._load_failed = False
+        self._camera_failed = False
+        self._inference_thread_ids: List[int] = []
+        
+        # Build the detector cascade (models are loaded later, on the detection thread); backends run cheapest first and stop at the first hit
+        backend_names = detection_cascade or backends_for_mode(detection_mode)
+        if inference_isolation == "process":
+            # Keeps inference from competing with the Qt UI for the interpreter
+            self.cascade = ProcessCascade(backend_names, detection_confidence, backend_options,
+                                          threads=inference_threads)
+        elif inference_isolation == "thread":
+            self.cascade = DetectorCascade(backend_names, detection_confidence, backend_options)
         else:
-            self.pose_detection = None
+            raise ValueError(f"Unknown inference isolation mode: {inference_isolation}")
+        if inference_threads and inference_isolation != "process":
+            logging.warning("inference_threads only applies with inference_isolation 'process'")
+        limit_threads(opencv_threads=opencv_threads)
+        self.governor = CpuGovernor(self._cpu_time, budget=cpu_budget) if cpu_budget > 0 else None
+        
+        self.roi_tracker = RoiTracker(expand=roi_expand, full_scan_every=roi_full_scan_every) if roi_tracking else None
+        self.approach_far_area = approach_far_area
+        self.approach_tracker = None
+        if approach_detection and enter_votes <= 1 and approach_far_area <= 0:
+            # The first detection would already report presence, so no approach could come first
+            logging.info("Approach detection disabled: it needs enter_votes > 1 or approach_far_area > 0")
+        elif approach_detection:
+            self.approach_tracker = ApproachTracker(growth=approach_growth, window=approach_window)
         
-        self.camera: Optional[cv2.VideoCapture] = None
+        # Capture runs on its own thread so slow inference never reads stale, buffered frames
+        if not isinstance(camera_source, FrameSource):
+            camera_source = create_source(camera_source, capture_size[0], capture_size[1])
+        self.capture = CameraCapture(camera_source, freshness=frame_freshness)
+        self.capture_size = capture_size
+        self.frame_bus: Optional[FrameBusWriter] = None
+        if frame_bus_enabled:
+            try:
+                self.frame_bus = FrameBusWriter(capture_size[0] * capture_size[1] * 3,
+                                                name=frame_bus_name, slots=frame_bus_slots)
+                self.capture.add_frame_listener(self.frame_bus.write)
+            except OSError as e:
+                logging.error(f"Could not create frame bus '{frame_bus_name}': {e}")
+        self.preprocessor = FramePreprocessor(inference_size)
     
     def start(self):
         """Start the presence detection in a background thread."""
@@ -60,31 +206,149 @@ class PresenceDetector:
             return
         
         self.is_running = True
+        self._paused = False
+        self._load_failed = False
+        self._camera_failed = False
+        # Report "warming" right away; the models load on the detection thread
+        self._warming = not self._models_loaded
+        self._stop_event.clear()
+        self._wake_event.clear()
         self._thread = threading.Thread(target=self._detection_loop, daemon=True)
         self._thread.start()
-        logging.info(f"Presence detector started in '{self.detection_mode}' mode")
+        logging.info(f"Presence detector started ({' -> '.join(self.cascade.names)})")
     
     def stop(self):
         """Stop the presence detection."""
         self.is_running = False
+        self._stop_event.set()
+        self._wake_event.set()
+        self.capture.interrupt()
         if self._thread:
             self._thread.join(timeout=5)
         
-        if self.camera:
-            self.camera.release()
-            self.camera = None
+        self.capture.stop()
+        self._emit_event("detector_state", self.get_detector_state())
+        self.dispatcher.stop()
         
         logging.info("Presence detector stopped")
     
+    def pause(self, release_camera: bool = False):
+        """
+        Pause detection without stopping the thread or unloading the models. Does not block.
+        
+        Args:
+            release_camera: Release the camera while paused (privacy/power); otherwise
+                keep it open so resume() is instant
+        """
+        if not self.is_running or self._paused:
+            return
+        
+        self._release_camera_on_pause = release_camera
+        self._paused = True
+        self._wake_event.set()
+        self.capture.interrupt()
+        self._emit_event("detector_state", self.get_detector_state())
+        logging.info(f"Presence detector paused{' (camera released)' if release_camera else ''}")
+    
+    def resume(self):
+        """Resume detection after pause(). Does not block."""
+        if not self._paused:
+            return
+        
+        self._paused = False
+        self._wake_event.set()
+        self._emit_event("detector_state", self.get_detector_state())
+        logging.info("Presence detector resumed")
+    
+    @property
+    def is_paused(self) -> bool:
+        """Whether detection is currently paused."""
+        return self._paused
+    
+    def close(self):
+        """Stop detection and release the detector models (and worker process, if any)."""
+        self.stop()
+        self.cascade.close()
+        self._models_loaded = False
+        if self.frame_bus:
+            self.frame_bus.close()
+            self.frame_bus = None
+    
+    def load_models(self) -> bool:
+        """
+        Load the detector models and warm them up with one dummy inference.
+        
+        Called on the detection thread when detection starts, so the UI thread never
+        waits for MediaPipe; does nothing if the models are already loaded. While this
+        runs, the detector state is "warming".
+        
+        Returns:
+            False if no detector backend could be loaded
+        """
+        if self._models_loaded:
+            return True
+        
+        self._warming = True
+        self._emit_event("detector_state", self.get_detector_state())
+        start_time = time.perf_counter()
+        known_threads = native_thread_ids()
+        try:
+            self.cascade.load()
+            # The first inference initialises the graphs (and the worker's shared memory);
+            # pay for it now rather than on the first real frame
+            width, height = self.capture_size
+            blank = np.zeros((height, width, 3), dtype=np.uint8)
+            self.cascade.detect(self.preprocessor.to_rgb(blank))
+            self._models_loaded = True
+            # Inference mostly runs on pool threads the libraries started just now; they
+            # count towards the CPU budget
+            self._inference_thread_ids = list(native_thread_ids() - known_threads)
+            logging.info(f"Detector models loaded and warmed up in {time.perf_counter() - start_time:.1f} s")
+        except Exception as e:
+            self._load_failed = True
+            logging.error(f"Could not load presence detection models: {e}", exc_info=True)
+        finally:
+            self._warming = False
+        
+        self._emit_event("detector_state", self.get_detector_state())
+        return self._models_loaded
+    
     def add_callback(self, callback: Callable[[bool], None]):
         """
         Add a callback function to be called when presence changes.
         
+        Callbacks run on a dispatcher thread, not the detection thread. If they fall
+        behind, intermediate states are skipped and only the latest state is delivered.
+        
         Args:
             callback: Function that takes a boolean (True if person present)
         """
         self._callbacks.append(callback)
     
+    def add_event_callback(self, callback: Callable[[str, object], None]):
+        """
+        Add a callback for detector events other than presence changes.
+        
+        Events:
+            - "image_state": "ok", "dark" or "blocked" when the image becomes (un)usable
+            - "approaching": backend name, when someone walks towards the tablet
+            - "cpu_governor": "throttling" or "normal" when the CPU governor starts or
+              stops stretching the check interval
+            - "detector_state": the new get_detector_state() value ("warming" while the
+              models load, "running", "paused", "stopped" or "error")
+        
+        Args:
+            callback: Function that takes the event name and its value
+        """
+        self._event_callbacks.append(callback)
+    
+    def add_frame_listener(self, listener: Callable):
+        """
+        Add a function called on the capture thread with each decoded frame and its
+        grab timestamp. It must be quick and must not keep the frame.
+        """
+        self.capture.add_frame_listener(listener)
+    
     def _notify_callbacks(self, present: bool):
         """Notify all registered callbacks of presence change."""
         for callback in self._callbacks:
@@ -93,99 +357,297 @@ class PresenceDetector:
             except Exception as e:
                 logging.error(f"Error in presence callback: {e}", exc_info=True)
     
+    def _notify_event_callbacks(self, event: str, value):
+        """Notify all registered event callbacks."""
+        for callback in self._event_callbacks:
+            try:
+                callback(event, value)
+            except Exception as e:
+                logging.error(f"Error in {event} callback: {e}", exc_info=True)
+    
+    def _emit_event(self, event: str, value):
+        """Queue an event for the event callbacks; newer values of the same event win."""
+        self.dispatcher.submit(event, partial(self._notify_event_callbacks, event), value)
+    
+    def _open_camera(self) -> bool:
+        """Start the capture thread and reset all per-scene state."""
+        # Open camera and start the capture thread
+        if not self.capture.start():
+            self.is_running = False
+            self._camera_failed = True
+            self._emit_event("detector_state", self.get_detector_state())
+            return False
+        
+        self.debouncer.reset(self.person_present)
+        if self.motion_gate:
+            self.motion_gate.reset()
+        if self.scheduler:
+            self.scheduler.reset()
+        if self.roi_tracker:
+            self.roi_tracker.reset()
+        if self.approach_tracker:
+            self.approach_tracker.reset()
+        if self.governor:
+            self.governor.reset()
+        
+        logging.info(f"Camera initialized for presence detection ({' -> '.join(self.cascade.names)})")
+        return True
+    
+    def _wait_while_paused(self) -> bool:
+        """
+        Block until resumed or stopped.
+        
+        Returns:
+            False if the detector should exit
+        """
+        released = self._release_camera_on_pause
+        if released:
+            self.capture.stop()
+        
+        while self._paused and not self._stop_event.is_set():
+            self._wake_event.wait()
+            self._wake_event.clear()
+        
+        if self._stop_event.is_set():
+            return False
+        if released:
+            return self._open_camera()
+        self.capture.flush()
+        if self.scheduler:
+            self.scheduler.reset()
+        if self.governor:
+            self.governor.reset()
+        return True
+    
     def _detection_loop(self):
         """Main detection loop running in background thread."""
-        # Open camera
-        self.camera = cv2.VideoCapture(0)
+        if not self._open_camera():
+            return
         
-        if not self.camera.isOpened():
-            logging.error("Could not open camera for presence detection")
+        # Load models after opening the camera, so the camera adjusts its exposure meanwhile
+        models_loaded = self._models_loaded
+        if not self.load_models():
             self.is_running = False
+            self.capture.stop()
             return
+        if models_loaded:
+            # load_models() only reports when it loads; a restart must report "running" too
+            self._emit_event("detector_state", self.get_detector_state())
         
-        # Set camera properties for faster processing
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        
-        previous_state = self.person_present
-        
-        logging.info(f"Camera initialized for presence detection in '{self.detection_mode}' mode")
-        
-        while self.is_running:
+        while not self._stop_event.is_set():
             try:
-                start_time = time.time()
-                
-                ret, frame = self.camera.read()
-                
-                if not ret:
-                    logging.warning("Could not read frame from camera")
-                    time.sleep(self.check_interval)
+                self._wake_event.clear()
+                if self._paused:
+                    if not self._wait_while_paused():
+                        break
                     continue
                 
-                # Convert to RGB for MediaPipe
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Detect based on mode
-                person_detected = False
-                detection_type = ""
-                
-                # Check for faces
-                if self.face_detection:
-                    face_results = self.face_detection.process(rgb_frame)
-                    if face_results.detections:
-                        person_detected = True
-                        detection_type = "face"
+                start_time = time.time()
                 
-                # Check for body/pose (if not already detected or in "both" mode)
-                if self.pose_detection and (not person_detected or self.detection_mode == "both"):
-                    pose_results = self.pose_detection.process(rgb_frame)
-                    
-                    # Check if pose landmarks were detected with sufficient visibility
-                    if pose_results.pose_landmarks:
-                        # Check key body landmarks for visibility
-                        # Using shoulders, hips, or torso landmarks
-                        key_landmarks = [
-                            pose_results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.LEFT_SHOULDER],
-                            pose_results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.RIGHT_SHOULDER],
-                            pose_results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.LEFT_HIP],
-                            pose_results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.RIGHT_HIP],
-                        ]
-                        
-                        # If at least 2 key landmarks are visible with good confidence
-                        visible_count = sum(1 for lm in key_landmarks if lm.visibility > self.detection_confidence)
-                        
-                        if visible_count >= 2:
-                            person_detected = True
-                            detection_type = "pose" if detection_type == "" else "face+pose"
+                # Always analyse the newest frame; older ones were dropped by the capture thread
+                captured = self.capture.get_frame(timeout=max(1.0, self.check_interval))
                 
-                # Update presence status
-                if person_detected:
-                    self.person_present = True
-                    self.last_detection_time = time.time()
-                else:
-                    self.person_present = False
+                if captured is None:
+                    # An interrupted wait (pause/stop) is not a camera problem
+                    if not self._wake_event.is_set():
+                        logging.warning("No new frame from camera")
+                        self.stats.record_missed_frame()
+                    continue
                 
-                # Notify if state changed
-                if self.person_present != previous_state:
-                    status_msg = f"Presence changed: {'Person detected' if self.person_present else 'No person detected'}"
-                    if self.person_present and detection_type:
-                        status_msg += f" ({detection_type})"
-                    logging.info(status_msg)
-                    self._notify_callbacks(self.person_present)
-                    previous_state = self.person_present
+                frame, grab_time = captured
+                self.process_frame(frame, grab_time, capture_time=time.time() - start_time)
+                self.stats.record_frame(
+                    self.last_timings,
+                    time.time() - start_time,
+                    inference_ran="convert" in self.last_timings
+                )
                 
-                # Sleep for remaining interval time
-                elapsed = time.time() - start_time
-                sleep_time = max(0, self.check_interval - elapsed)
-                time.sleep(sleep_time)
+                self._sleep_until_next_check(start_time)
                 
             except Exception as e:
                 logging.error(f"Error in detection loop: {e}", exc_info=True)
-                time.sleep(self.check_interval)
+                self._stop_event.wait(self.check_interval)
         
         # Cleanup
-        if self.camera:
-            self.camera.release()
+        self.capture.stop()
+    
+    def process_frame(self, frame, grab_time: float, capture_time: float = 0.0) -> Optional[Detection]:
+        """
+        Run one detection step on a captured frame and update the presence state.
+        
+        Called by the detection loop; benchmarks call it directly with replayed frames.
+        Per-stage timings are left in `last_timings`.
+        
+        Args:
+            frame: BGR frame at capture resolution
+            grab_time: When the frame was grabbed from the source (time.time())
+            capture_time: Seconds spent waiting for/decoding the frame
+        
+        Returns:
+            The detection in this frame, or None if nobody was found or inference was skipped
+        """
+        timings = {"capture": capture_time}
+        self.last_timings = timings
+        self.last_frame_age = time.time() - grab_time
+        logging.debug(f"Analysing frame captured {self.last_frame_age * 1000:.0f} ms ago")
+        
+        # Skip everything on frames that are too dark or featureless; presence is left as
+        # it is and the image state is reported separately from "no person"
+        if self.image_check:
+            stage_start = time.perf_counter()
+            image_state = self.image_check.check(frame)
+            timings["quality"] = time.perf_counter() - stage_start
+            if image_state != self.image_state:
+                self._on_image_state_changed(image_state)
+            if image_state != "ok":
+                return None
+        
+        # Skip inference on static frames, but re-confirm presence periodically
+        if self.motion_gate:
+            stage_start = time.perf_counter()
+            motion = self.motion_gate.update(frame)
+            timings["motion"] = time.perf_counter() - stage_start
+            if motion and self.scheduler:
+                self.scheduler.note_activity()
+            recheck_due = time.time() - self._last_inference_time >= self.motion_recheck_interval
+            if not motion and not recheck_due:
+                return None
+        
+        self._last_inference_time = time.time()
+        
+        # Resize and convert to RGB for the detectors (into reused buffers)
+        stage_start = time.perf_counter()
+        rgb_frame = self.preprocessor.to_rgb(frame)
+        timings["convert"] = time.perf_counter() - stage_start
+        
+        # Run the cascade; it stops at the first backend that finds someone
+        detection = self._run_inference(rgb_frame)
+        detection_type = detection.backend if detection else ""
+        # Someone far away is only tracked for approach; the frame does not vote either way
+        far = detection is not None and self.approach_tracker is not None and self._is_far(detection)
+        person_detected = detection is not None and not far
+        
+        # A quickly growing box means someone is walking up; report it before they arrive.
+        # Growth only counts before presence is reported, so the event always comes first
+        approaching = detection and self.approach_tracker and self.approach_tracker.update(detection)
+        if approaching and not self.person_present:
+            logging.info(f"Person approaching ({detection.backend}, box grew "
+                         f"{self.approach_tracker.last_growth:.1f}x)")
+            self._emit_event("approaching", detection.backend)
+            if self.scheduler:
+                self.scheduler.note_activity()
+        
+        # Update presence status through N-of-M voting, so a person half in
+        # frame does not flip the state (and the screen) on every miss
+        previous_state = self.person_present
+        if person_detected:
+            self.last_detection_time = time.time()
+        if not far:
+            self.person_present = self.debouncer.update(person_detected)
+        
+        # Notify if state changed
+        if self.person_present != previous_state:
+            status_msg = f"Presence changed: {'Person detected' if self.person_present else 'No person detected'}"
+            if self.person_present and detection_type:
+                status_msg += f" ({detection_type})"
+            status_msg += f", frame age {self.last_frame_age * 1000:.0f} ms"
+            logging.info(status_msg)
+            stage_start = time.perf_counter()
+            self.dispatcher.submit("presence", self._notify_callbacks, self.person_present)
+            timings["callback"] = time.perf_counter() - stage_start
+            if self.scheduler:
+                self.scheduler.note_activity()
+        
+        return detection
+    
+    def _is_far(self, detection: Detection) -> bool:
+        """Whether a detection's box is too small to count as someone present."""
+        _, _, width, height = detection.bbox
+        return width * height < self.approach_far_area
+    
+    def _on_image_state_changed(self, image_state: str):
+        """Log and report a change between a usable and an unusable image."""
+        logging.info(f"Image state changed: {self.image_state} -> {image_state} "
+                     f"(brightness {self.image_check.last_brightness:.0f}, "
+                     f"contrast {self.image_check.last_contrast:.1f})")
+        self.image_state = image_state
+        if image_state != "ok" and self.roi_tracker:
+            self.roi_tracker.reset()
+        self._emit_event("image_state", image_state)
+    
+    def _run_inference(self, rgb_frame) -> Optional[Detection]:
+        """Run the cascade, scanning the region around the last detection first."""
+        region = self.roi_tracker.next_region() if self.roi_tracker else None
+        detection = None
+        
+        if region is not None:
+            detection = self.cascade.detect(crop_region(rgb_frame, region))
+            self._add_backend_timings()
+            if detection:
+                detection = detection._replace(bbox=to_frame_coords(detection.bbox, region))
+            else:
+                logging.debug("Nobody in the tracked region, falling back to a full-frame scan")
+                self.roi_tracker.update(None, region)
+                region = None
+        
+        if region is None:
+            detection = self.cascade.detect(rgb_frame)
+            self._add_backend_timings()
+        
+        if self.roi_tracker:
+            self.roi_tracker.update(detection.bbox if detection else None, region)
+        return detection
+    
+    def _add_backend_timings(self):
+        """Add the cascade's per-backend times for its last run to last_timings."""
+        for name, seconds in self.cascade.last_timings.items():
+            self.last_timings[name] = self.last_timings.get(name, 0.0) + seconds
+    
+    def _sleep_until_next_check(self, start_time: float):
+        """Sleep for the remainder of the current sampling interval."""
+        if self.scheduler:
+            screen_on = self.screen_state_provider() if self.screen_state_provider else True
+            interval = self.scheduler.next_interval(
+                self.person_present,
+                self.get_time_since_last_detection(),
+                screen_on,
+                self.presence_timeout
+            )
+        else:
+            interval = self.check_interval
+        
+        # Check less often while detection uses more than its CPU budget
+        if self.governor:
+            if self.governor.update():
+                self._on_governor_changed()
+            interval = self.governor.apply(interval)
+        
+        # Interruptible, so pause() and stop() take effect immediately
+        elapsed = time.time() - start_time
+        self._wake_event.wait(max(0, interval - elapsed))
+    
+    def _cpu_time(self) -> float:
+        """
+        CPU seconds used by the detector: the detection and capture threads, the library
+        threads started while loading the models, and the inference worker, if any.
+        """
+        # Only the detector's own threads: UI, MQTT and snapshot work must not throttle detection
+        thread_ids = [self._thread.native_id if self._thread else None, self.capture.native_id]
+        thread_ids += self._inference_thread_ids
+        cpu = thread_cpu_time(thread_id for thread_id in thread_ids if thread_id)
+        if isinstance(self.cascade, ProcessCascade):
+            cpu += self.cascade.worker_cpu_time()
+        return cpu
+    
+    def _on_governor_changed(self):
+        """Log and report when the CPU governor starts or stops throttling."""
+        state = self.governor.get_state()
+        if state["throttling"]:
+            logging.warning(f"Detection uses {state['cpu_share']:.0%} CPU (budget {state['budget']:.0%}), "
+                            f"slowing checks down {state['stretch']:.1f}x")
+        else:
+            logging.info(f"Detection back within CPU budget ({state['cpu_share']:.0%})")
+        self._emit_event("cpu_governor", "throttling" if state["throttling"] else "normal")
     
     def get_presence_status(self) -> bool:
         """Get current presence status."""
@@ -196,3 +658,46 @@ class PresenceDetector:
         if self.last_detection_time == 0:
             return float('inf')
         return time.time() - self.last_detection_time
+    
+    def get_detector_state(self) -> str:
+        """Get the detector state: "stopped", "warming", "running", "paused" or "error"."""
+        if self._load_failed or self._camera_failed:
+            return "error"
+        if not self.is_running:
+            return "stopped"
+        if self._warming:
+            return "warming"
+        if self._paused:
+            return "paused"
+        return "running"
+    
+    def get_image_state(self) -> str:
+        """Get the image state: "ok", or "dark"/"blocked" while inference is skipped."""
+        return self.image_state
+    
+    def get_last_frame_age(self) -> float:
+        """Get the age in seconds of the most recently analysed frame when analysis started."""
+        return self.last_frame_age
+    
+    def get_stats(self) -> dict:
+        """
+        Get rolling runtime statistics. Safe and cheap to call from any thread.
+        
+        Returns:
+            Dict with per-stage latency summaries ("stages": capture, quality, motion, convert,
+            one entry per backend, callback), the end-to-end loop time ("loop"), the
+            effective analysis and inference rates ("fps", "inference_fps") and frame
+            counters (analysed, inference skipped, missed, unusable image, and
+            dropped/flushed by the capture thread), plus callback delivery counters and
+            the CPU governor state
+        """
+        stats = self.stats.snapshot()
+        stats["callbacks"] = self.dispatcher.get_stats()
+        stats["frames_dropped"] = self.capture.frames_dropped
+        stats["frames_flushed"] = self.capture.frames_flushed
+        stats["last_frame_age_ms"] = self.last_frame_age * 1000
+        if self.image_check:
+            stats["frames_unusable"] = self.image_check.unusable_frames
+        if self.governor:
+            stats["governor"] = self.governor.get_state()
+        return stats
@@ -0,0 +1,134 @@
+import logging
+import mmap
+import os
+import struct
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+MAGIC = b"THPH"
+# magic, capacity (records), total records ever written
+HEADER = struct.Struct("<4sIQ")
+# timestamp, state
+RECORD = struct.Struct("<dB7x")
+
+# Record states
+ABSENT = 0
+PRESENT = 1
+STOPPED = 2  # detection stopped or paused; the time until the next record is not observed
+
+
+class PresenceHistory:
+    """
+    Bounded on-disk log of presence transitions, kept in a memory-mapped ring file.
+
+    Every transition is one fixed-width 16-byte record, so appending is a single write
+    into the mapping. Once `capacity` records have been written the oldest ones are
+    overwritten, so the file never grows.
+    """
+
+    def __init__(self, path: str, capacity: int = 20000, days: int = 28,
+                 busy_occupancy: float = 0.2, min_observed_hours: float = 2.0):
+        """
+        Open (or create) the history file.
+
+        Args:
+            path: History file path
+            capacity: Number of transitions kept
+            days: How many days of history the hourly profile is computed from
+            busy_occupancy: Hourly occupancy from which an hour counts as normally busy
+            min_observed_hours: Observed hours needed before an hour of day gets a profile
+        """
+        self.path = path
+        self.capacity = capacity
+        self.days = days
+        self.busy_occupancy = busy_occupancy
+        self.min_observed_hours = min_observed_hours
+
+        size = HEADER.size + capacity * RECORD.size
+        existing = os.path.exists(path) and os.path.getsize(path) == size
+        self._file = open(path, "r+b" if existing else "w+b")
+        if not existing:
+            self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+        magic, stored_capacity, self._total = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or stored_capacity != capacity:
+            if existing:
+                logging.warning(f"Presence history {path} has an unknown format, starting a new one")
+            self._total = 0
+            HEADER.pack_into(self._map, 0, MAGIC, capacity, 0)
+
+    def append(self, state: int, timestamp: Optional[float] = None):
+        """
+        Record a transition.
+
+        Args:
+            state: ABSENT, PRESENT or STOPPED
+            timestamp: When it happened (defaults to now)
+        """
+        offset = HEADER.size + (self._total % self.capacity) * RECORD.size
+        RECORD.pack_into(self._map, offset, time.time() if timestamp is None else timestamp, state)
+        self._total += 1
+        HEADER.pack_into(self._map, 0, MAGIC, self.capacity, self._total)
+
+    def records(self) -> List[Tuple[float, int]]:
+        """Get all stored (timestamp, state) records, oldest first."""
+        count = min(self._total, self.capacity)
+        first = self._total - count
+        return [
+            RECORD.unpack_from(self._map, HEADER.size + (index % self.capacity) * RECORD.size)
+            for index in range(first, self._total)
+        ]
+
+    def hourly_occupancy(self, now: Optional[float] = None) -> List[Optional[float]]:
+        """
+        Compute the share of observed time someone was present, per hour of the day.
+
+        Args:
+            now: End of the period (defaults to now); the last state lasts until then
+
+        Returns:
+            24 values from 0.0 to 1.0, or None for hours with too little history
+        """
+        now = time.time() if now is None else now
+        since = now - self.days * 86400
+        records = [record for record in self.records() if record[0] >= since]
+
+        present = [0.0] * 24
+        observed = [0.0] * 24
+        for (start, state), (end, _) in zip(records, records[1:] + [(now, STOPPED)]):
+            if state == STOPPED:
+                continue
+            # Split the interval at hour boundaries
+            while start < end:
+                local = datetime.fromtimestamp(start)
+                hour_end = start - (local.minute * 60 + local.second + local.microsecond / 1e6) + 3600
+                segment_end = min(end, hour_end)
+                observed[local.hour] += segment_end - start
+                if state == PRESENT:
+                    present[local.hour] += segment_end - start
+                start = segment_end
+
+        min_observed = self.min_observed_hours * 3600
+        return [
+            present[hour] / observed[hour] if observed[hour] >= min_observed else None
+            for hour in range(24)
+        ]
+
+    def activity_factor(self, occupancy: Optional[float]) -> float:
+        """
+        Map an hour's occupancy to a factor from 0.0 (always empty) to 1.0 (normally busy).
+
+        Hours without enough history count as busy, so nothing changes until enough
+        has been learned.
+        """
+        if occupancy is None:
+            return 1.0
+        return min(1.0, occupancy / self.busy_occupancy)
+
+    def close(self):
+        """Write the mapping to disk and close the file."""
+        self._map.flush()
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,92 @@
+import numpy as np
+from typing import Optional, Tuple
+
+# (x, y, width, height), normalized to 0.0-1.0 of the full frame
+Region = Tuple[float, float, float, float]
+
+
+class RoiTracker:
+    """Remembers where the last person was found so the next checks can scan a crop first."""
+
+    def __init__(self, expand: float = 2.0, full_scan_every: int = 10, min_size: float = 0.3):
+        """
+        Initialize the region-of-interest tracker.
+
+        Args:
+            expand: Factor by which the last bounding box is enlarged (around its center)
+            full_scan_every: Force a full-frame scan after this many consecutive crop scans
+            min_size: Minimum crop width/height as a fraction of the frame, so small faces
+                still get enough context for the detectors
+        """
+        self.expand = expand
+        self.full_scan_every = full_scan_every
+        self.min_size = min_size
+        self.crop_hits = 0
+        self.crop_misses = 0
+        self.full_scans = 0
+
+        self._last_bbox: Optional[Region] = None
+        self._crop_scans = 0
+
+    def reset(self):
+        """Forget the last position."""
+        self._last_bbox = None
+        self._crop_scans = 0
+
+    def next_region(self) -> Optional[Region]:
+        """
+        Region to scan first for the next frame.
+
+        Returns:
+            The enlarged last bounding box, or None if a full-frame scan is due
+        """
+        if self._last_bbox is None or self._crop_scans >= self.full_scan_every:
+            return None
+
+        x, y, w, h = self._last_bbox
+        cx, cy = x + w / 2, y + h / 2
+        w = min(1.0, max(w * self.expand, self.min_size))
+        h = min(1.0, max(h * self.expand, self.min_size))
+        x = min(max(cx - w / 2, 0.0), 1.0 - w)
+        y = min(max(cy - h / 2, 0.0), 1.0 - h)
+        return (x, y, w, h)
+
+    def update(self, bbox: Optional[Region], region: Optional[Region]):
+        """
+        Record the outcome of a scan.
+
+        Args:
+            bbox: Bounding box found (in full-frame coordinates), or None
+            region: Region that was scanned, or None for a full-frame scan
+        """
+        if region is None:
+            self.full_scans += 1
+            self._crop_scans = 0
+        else:
+            self._crop_scans += 1
+            if bbox is not None:
+                self.crop_hits += 1
+            else:
+                self.crop_misses += 1
+
+        if bbox is not None:
+            self._last_bbox = bbox
+        elif region is None:
+            # Nobody anywhere in the frame
+            self._last_bbox = None
+
+
+def crop_region(frame: np.ndarray, region: Region) -> np.ndarray:
+    """Return a view of the frame covering a normalized region (no copy)."""
+    height, width = frame.shape[:2]
+    x, y, w, h = region
+    left, top = int(x * width), int(y * height)
+    right, bottom = int(round((x + w) * width)), int(round((y + h) * height))
+    return frame[top:bottom, left:right]
+
+
+def to_frame_coords(bbox: Region, region: Region) -> Region:
+    """Map a bounding box normalized to a crop back to full-frame coordinates."""
+    bx, by, bw, bh = bbox
+    rx, ry, rw, rh = region
+    return (rx + bx * rw, ry + by * rh, bw * rw, bh * rh)
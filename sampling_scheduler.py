@@ -0,0 +1,92 @@
+import logging
+import time
+from typing import Optional
+
+
+class SamplingScheduler:
+    """Chooses the delay before the next presence check based on recent activity."""
+
+    def __init__(self, base_interval: float = 1.0, min_interval: float = 0.2, max_interval: float = 3.0,
+                 fast_duration: float = 5.0, idle_backoff_after: float = 120.0,
+                 backoff_factor: float = 1.5, timeout_window: float = 10.0):
+        """
+        Initialize the sampling scheduler.
+
+        Args:
+            base_interval: Normal time between checks in seconds
+            min_interval: Fastest allowed time between checks (floor) in seconds
+            max_interval: Slowest allowed time between checks (ceiling) in seconds
+            fast_duration: Seconds to sample at the fast rate after motion or a presence change
+            idle_backoff_after: Seconds without anyone seen before backing off towards max_interval
+            backoff_factor: Multiplier applied to the interval on every idle check while backing off
+            timeout_window: Seconds before the presence timeout in which to sample fast
+                while the screen is still on
+        """
+        self.base_interval = base_interval
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.fast_duration = fast_duration
+        self.idle_backoff_after = idle_backoff_after
+        self.backoff_factor = backoff_factor
+        self.timeout_window = timeout_window
+        self.current_interval = base_interval
+        self.reason = "base"
+
+        self._fast_until = 0.0
+        self._started = time.time()
+
+    def reset(self):
+        """Start over at the base rate (e.g. when detection is (re)started)."""
+        self.current_interval = self.base_interval
+        self.reason = "base"
+        self._fast_until = 0.0
+        self._started = time.time()
+
+    def note_activity(self, duration: Optional[float] = None):
+        """
+        Switch to the fast rate for a while, e.g. after motion or a presence change.
+
+        Args:
+            duration: Seconds to stay fast, defaults to fast_duration
+        """
+        until = time.time() + (self.fast_duration if duration is None else duration)
+        self._fast_until = max(self._fast_until, until)
+
+    def next_interval(self, person_present: bool, time_since_detection: float,
+                      screen_on: bool, presence_timeout: float) -> float:
+        """
+        Compute the time until the next check.
+
+        Args:
+            person_present: Current presence state
+            time_since_detection: Seconds since someone was last detected (inf if never)
+            screen_on: Whether the screen is currently on
+            presence_timeout: Seconds without presence after which the screen turns off
+
+        Returns:
+            Interval in seconds, clamped to [min_interval, max_interval]
+        """
+        now = time.time()
+        idle_time = min(time_since_detection, now - self._started)
+
+        if now < self._fast_until:
+            interval, reason = self.min_interval, "activity"
+        elif (screen_on and not person_present
+              and presence_timeout - self.timeout_window <= idle_time < presence_timeout):
+            # Last chance to catch someone before the screen turns off (or dims); once the
+            # timeout has passed, the screen staying on is no reason to keep sampling fast
+            interval, reason = self.min_interval, "timeout"
+        elif not person_present and idle_time >= self.idle_backoff_after:
+            start = max(self.current_interval, self.base_interval)
+            interval = start * self.backoff_factor if self.reason == "idle" else start
+            reason = "idle"
+        else:
+            interval, reason = self.base_interval, "base"
+
+        interval = max(self.min_interval, min(self.max_interval, interval))
+        if reason != self.reason:
+            logging.debug(f"Sampling interval {interval:.2f}s ({reason})")
+
+        self.current_interval = interval
+        self.reason = reason
+        return interval
@@ -3,11 +3,23 @@ import logging
 import screen_brightness_control as sbc
 import platform
 import time
-from threading import Timer
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock, Timer
+from typing import Callable, Optional
+from brightness_writer import EASINGS, BrightnessWriter
 
 
 class ScreenController:
-    """Controls screen power and brightness on Windows."""
+    """
+    Controls screen power and brightness on Windows.
+    
+    The controller tracks the state it put the screen in (on, dimmed to a level, or off)
+    and the brightness it last wrote, and skips hardware calls that would not change
+    anything: every brightness write is a slow DDC/CI or WMI call.
+    
+    Dimming, undimming and restoring the brightness on wake fade over `fade_duration`
+    seconds on the brightness writer thread.
+    """
     
     # Windows API constants for monitor power control
     WM_SYSCOMMAND = 0x0112
@@ -16,10 +28,52 @@ class ScreenController:
     MONITOR_OFF = 2
     MONITOR_STANDBY = 1
     
-    def __init__(self):
+    # Screen states
+    STATE_ON = "on"
+    STATE_DIMMED = "dimmed"
+    STATE_OFF = "off"
+    
+    def __init__(self, brightness_interval: float = 0.25,
+                 on_brightness_applied: Optional[Callable[[int], None]] = None,
+                 brightness_refresh_interval: float = 600.0,
+                 fade_duration: float = 0.0, fade_easing: str = "ease_in_out"):
+        """
+        Initialize the controller.
+        
+        Args:
+            brightness_interval: Minimum seconds between brightness writes made on the
+                brightness writer thread (requested levels and fade steps)
+            on_brightness_applied: Called with the level once a requested brightness
+                was applied (on the brightness writer thread)
+            brightness_refresh_interval: Seconds after which the cached brightness is read
+                from the monitor again, to pick up changes made outside the app (0 = only
+                when asked to)
+            fade_duration: Seconds a dim, undim or wake brightness change fades over
+                (0 = change at once)
+            fade_easing: Easing curve of the fades (linear, ease_in, ease_out or ease_in_out)
+        """
         self.is_windows = platform.system() == "Windows"
         self._original_brightness = None
-        self._screen_is_off = False
+        self.state = self.STATE_ON
+        self.dim_level = None
+        self.suppressed_writes = 0
+        self.brightness_refresh_interval = brightness_refresh_interval
+        self._brightness = None  # Last level written or read, None until known
+        self._brightness_time = 0.0
+        self.fade_duration = fade_duration
+        self.fade_easing = fade_easing
+        if fade_easing not in EASINGS:
+            logging.warning(f"Unknown fade easing '{fade_easing}', using linear")
+            self.fade_easing = "linear"
+        # _lock guards the cached state and is never held during monitor I/O; the monitor
+        # itself is only accessed under _hardware_lock, by the writer and power threads
+        self._lock = Lock()
+        self._hardware_lock = Lock()
+        self.brightness_writer = BrightnessWriter(self.set_brightness, brightness_interval,
+                                                  on_brightness_applied, self._fade_start_level)
+        self.brightness_writer.start()
+        # Power changes run here, one at a time and in the order they were requested
+        self._power_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screen-power")
         self._hwnd = None
         self._keep_awake_timer = None
         
@@ -31,11 +85,15 @@ class ScreenController:
                 logging.warning(f"Could not get window handle: {e}")
     
     def turn_screen_off(self):
-        """Turn off the screen completely without triggering lock screen."""
+        """Turn off the screen completely without triggering lock screen (blocking, see request_screen_power)."""
         if not self.is_windows:
             logging.warning("Screen control only supported on Windows")
             return
         
+        if self.state == self.STATE_OFF:
+            self._suppress("turn off")
+            return
+        
         try:
             # Save current brightness if not already saved
             if self._original_brightness is None:
@@ -51,8 +109,8 @@ class ScreenController:
                     self.SC_MONITORPOWER,
                     self.MONITOR_OFF
                 )
-                logging.info("Screen turned off via Windows API (monitor power off)")
-                self._screen_is_off = True
+                logging.debug("Screen turned off via Windows API (monitor power off)")
+                self._set_state(self.STATE_OFF)
                 
                 # Start keep-awake mechanism to prevent Windows from locking
                 self._start_keep_awake()
@@ -60,19 +118,23 @@ class ScreenController:
             except Exception as api_error:
                 logging.warning(f"Windows API method failed: {api_error}, falling back to brightness")
                 # Fallback: Dim to 0% if API fails
-                self.set_brightness(0)
-                self._screen_is_off = True
-                logging.info("Screen turned off (brightness set to 0% - fallback method)")
+                self.brightness_writer.request(0)
+                logging.debug("Screen turned off (brightness set to 0% - fallback method)")
+                self._set_state(self.STATE_OFF)
                 
         except Exception as e:
             logging.error(f"Error turning screen off: {e}", exc_info=True)
     
     def turn_screen_on(self):
-        """Turn on the screen by restoring brightness."""
+        """Turn on the screen by restoring brightness (blocking, see request_screen_power)."""
         if not self.is_windows:
             logging.warning("Screen control only supported on Windows")
             return
         
+        if self.state == self.STATE_ON:
+            self._suppress("turn on")
+            return
+        
         try:
             # Stop keep-awake mechanism
             self._stop_keep_awake()
@@ -85,7 +147,7 @@ class ScreenController:
                     self.SC_MONITORPOWER,
                     self.MONITOR_ON
                 )
-                logging.info("Screen turned on via Windows API")
+                logging.debug("Screen turned on via Windows API")
                 
                 # Small delay to let monitor wake up
                 time.sleep(0.1)
@@ -93,66 +155,200 @@ class ScreenController:
             except Exception as api_error:
                 logging.warning(f"Windows API wake failed: {api_error}")
             
-            # Always restore brightness to ensure screen is visible
+            # Restore brightness to ensure screen is visible (default to 80% if none saved);
+            # nothing is written when the monitor was powered off and still has the right level
             if self._original_brightness is not None:
-                self.set_brightness(self._original_brightness)
-                self._screen_is_off = False
-                logging.info(f"Screen brightness restored to {self._original_brightness}%")
+                self._fade_brightness(self._original_brightness)
             else:
-                # Default to 80% if no saved brightness
-                self.set_brightness(80)
-                self._screen_is_off = False
-                logging.info("Screen turned on (brightness set to 80%)")
+                self._fade_brightness(80)
+            self._set_state(self.STATE_ON)
                 
         except Exception as e:
             logging.error(f"Error turning screen on: {e}", exc_info=True)
     
-    def set_brightness(self, level: int):
+    def request_screen_power(self, on: bool,
+                             on_done: Optional[Callable[[bool], None]] = None) -> Future:
         """
-        Set screen brightness.
+        Turn the screen on or off on the screen power thread; returns immediately.
+        
+        Args:
+            on: True to turn the screen on, False to turn it off
+            on_done: Called with True if the screen is on afterwards, once the change
+                finished (on the screen power thread)
+        
+        Returns:
+            Future that completes when the change finished
+        """
+        def run():
+            if on:
+                self.turn_screen_on()
+            else:
+                self.turn_screen_off()
+            if on_done:
+                on_done(not self.is_screen_off())
+        
+        return self._power_executor.submit(run)
+    
+    def set_brightness(self, level: int) -> bool:
+        """
+        Set screen brightness (blocks until the monitor has taken it).
         
         Args:
             level: Brightness level (0-100)
+        
+        Returns:
+            True if the screen now has this brightness
         """
-        try:
-            level = max(0, min(100, level))
-            sbc.set_brightness(level)
-            logging.debug(f"Brightness set to {level}%")
-        except Exception as e:
-            logging.error(f"Error setting brightness: {e}")
+        level = max(0, min(100, level))
+        with self._lock:
+            # A stale cache may miss a change made outside the app, so write anyway
+            if level == self._brightness and self._cache_is_fresh():
+                self.suppressed_writes += 1
+                logging.debug(f"Brightness already {level}%, skipping write")
+                return True
+        
+        with self._hardware_lock:
+            try:
+                sbc.set_brightness(level)
+            except Exception as e:
+                logging.error(f"Error setting brightness: {e}")
+                return False
+        
+        with self._lock:
+            self._brightness = level
+            self._brightness_time = time.monotonic()
+        logging.debug(f"Brightness set to {level}%")
+        return True
     
-    def get_brightness(self) -> int:
-        """Get current screen brightness."""
-        try:
-            brightness = sbc.get_brightness()
-            if isinstance(brightness, list):
-                return brightness[0] if brightness else 50
-            return brightness
-        except Exception as e:
-            logging.error(f"Error getting brightness: {e}")
-            return 50
+    def request_brightness(self, level: int):
+        """
+        Set screen brightness on the brightness writer thread; returns immediately.
+        
+        Levels requested faster than the monitor takes them are coalesced, so only
+        the newest one is written.
+        
+        Args:
+            level: Brightness level (0-100)
+        """
+        self.brightness_writer.request(level)
+    
+    def _fade_brightness(self, level: int):
+        """Fade to a brightness level on the brightness writer thread; returns immediately."""
+        self.brightness_writer.request(level, self.fade_duration, self.fade_easing)
+    
+    def get_brightness(self, refresh: bool = False) -> int:
+        """
+        Get current screen brightness.
+        
+        The level last written or read is cached. The monitor is only queried when
+        nothing is known yet, when the cached value is older than the refresh interval,
+        or when asked to.
+        
+        Args:
+            refresh: Query the monitor even if a cached value is available
+        
+        May query the monitor, so it is meant for the brightness writer and power
+        threads; the UI thread uses the cached level (see save_brightness).
+        """
+        with self._lock:
+            if not refresh and self._cache_is_fresh():
+                return self._brightness
+        
+        with self._hardware_lock:
+            try:
+                brightness = sbc.get_brightness()
+                if isinstance(brightness, list):
+                    if not brightness:
+                        return 50
+                    brightness = brightness[0]
+            except Exception as e:
+                logging.error(f"Error getting brightness: {e}")
+                return self._brightness if self._brightness is not None else 50
+        
+        with self._lock:
+            if self._brightness is not None and brightness != self._brightness:
+                logging.info(f"Brightness changed outside the app: {self._brightness}% -> {brightness}%")
+            self._brightness = brightness
+            self._brightness_time = time.monotonic()
+        return brightness
+    
+    def _fade_start_level(self) -> int:
+        """Get the level a fade starts from (on the brightness writer thread)."""
+        level = self.get_brightness()
+        # A first dim with nothing cached could not save the brightness on the UI thread
+        if self._original_brightness is None and level > 0:
+            self._original_brightness = level
+        return level
+    
+    def _cache_is_fresh(self) -> bool:
+        """Whether the cached brightness is known and younger than the refresh interval."""
+        if self._brightness is None:
+            return False
+        age = time.monotonic() - self._brightness_time
+        return self.brightness_refresh_interval <= 0 or age < self.brightness_refresh_interval
     
     def save_brightness(self):
-        """Save current brightness level."""
-        current = self.get_brightness()
+        """
+        Save current brightness level, as far as it is known without querying the monitor.
+        
+        Uses the cached level (or the level last requested); with neither known, the
+        brightness writer saves it when it starts the next fade.
+        """
+        with self._lock:
+            current = self._brightness
+        if current is None:
+            current = self.brightness_writer.target
         # Only save if brightness is not 0 (screen not "off")
-        if current > 0:
+        if current is not None and current > 0:
             self._original_brightness = current
     
     def restore_brightness(self):
-        """Restore saved brightness level."""
+        """Restore saved brightness level (fading, without waiting for it)."""
         if self._original_brightness is not None:
-            self.set_brightness(self._original_brightness)
+            self._fade_brightness(self._original_brightness)
+            if self.state == self.STATE_DIMMED:
+                self._set_state(self.STATE_ON)
     
     def dim_screen(self, dim_level: int = 20):
-        """Dim the screen to specified level."""
+        """Dim the screen to specified level (fading, does nothing if it already is or is off)."""
+        if self.state == self.STATE_OFF:
+            # Writing to a powered-off monitor would also end the keep-awake refresh
+            self._suppress(f"dim to {dim_level}%")
+            return
+        if self.state == self.STATE_DIMMED and self.brightness_writer.target == dim_level:
+            self._suppress(f"dim to {dim_level}%")
+            return
         if self._original_brightness is None or self._original_brightness == 0:
             self.save_brightness()
-        self.set_brightness(dim_level)
+        self._fade_brightness(dim_level)
+        self._set_state(self.STATE_DIMMED, dim_level)
     
     def is_screen_off(self) -> bool:
         """Check if screen is currently off."""
-        return self._screen_is_off
+        return self.state == self.STATE_OFF
+    
+    def get_state(self) -> dict:
+        """Get the screen state, dim level, last written brightness and suppressed write count."""
+        return {
+            "state": self.state,
+            "dim_level": self.dim_level,
+            "brightness": self._brightness,
+            "suppressed_writes": self.suppressed_writes,
+        }
+    
+    def _set_state(self, state: str, dim_level: Optional[int] = None):
+        """Record a screen state transition, logging it once."""
+        if state == self.state and dim_level == self.dim_level:
+            return
+        level = f" ({dim_level}%)" if dim_level is not None else ""
+        logging.info(f"Screen {self.state} -> {state}{level}")
+        self.state = state
+        self.dim_level = dim_level
+    
+    def _suppress(self, action: str):
+        """Count a hardware call skipped because the screen is already in that state."""
+        self.suppressed_writes += 1
+        logging.debug(f"Screen already {self.state}, skipping {action}")
     
     def _start_keep_awake(self):
         """Start periodic system activity to prevent lock screen."""
@@ -230,7 +426,7 @@ class ScreenController:
     
     def _refresh_keep_awake(self):
         """Refresh the keep-awake state periodically."""
-        if self._screen_is_off and self.is_windows:
+        if self.state == self.STATE_OFF and self.is_windows:
             try:
                 # Refresh execution state
                 ES_CONTINUOUS = 0x80000000
@@ -272,5 +468,7 @@ class ScreenController:
     
     def cleanup(self):
         """Clean up resources when controller is destroyed."""
+        self._power_executor.shutdown(wait=True)
+        self.brightness_writer.stop()
         self._stop_keep_awake()
 
@@ -0,0 +1,115 @@
+import cv2
+import logging
+import numpy as np
+import threading
+import time
+from typing import Callable, Optional
+
+
+class SnapshotPublisher:
+    """
+    Publishes low-rate JPEG snapshots built from frames that are captured anyway.
+
+    offer() is called with every captured frame and returns almost immediately: it only
+    takes a copy when a snapshot is due and somebody can receive it. Downscaling and JPEG
+    encoding happen on the publisher's own thread.
+    """
+
+    def __init__(self, publish: Callable[[bytes], None], period: float = 10.0,
+                 width: int = 320, jpeg_quality: int = 70,
+                 is_active: Optional[Callable[[], bool]] = None):
+        """
+        Initialize the publisher.
+
+        Args:
+            publish: Function that sends the encoded JPEG bytes
+            period: Minimum seconds between snapshots
+            width: Snapshot width in pixels (the height keeps the aspect ratio)
+            jpeg_quality: JPEG quality (0-100)
+            is_active: Function returning False while snapshots cannot be delivered
+                (e.g. MQTT disconnected); nothing is encoded then
+        """
+        self.publish = publish
+        self.period = period
+        self.width = width
+        self.jpeg_quality = jpeg_quality
+        self.is_active = is_active
+        self.enabled = True
+        self.published = 0
+        self.last_encode_time = 0.0
+
+        self._pending: Optional[np.ndarray] = None
+        self._last_offer_time = 0.0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the encoding thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="snapshot-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the encoding thread."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def set_enabled(self, enabled: bool):
+        """Turn snapshots on or off at runtime."""
+        self.enabled = enabled
+        logging.info(f"Camera snapshots {'enabled' if enabled else 'disabled'}")
+
+    def offer(self, frame: np.ndarray, timestamp: float):
+        """
+        Offer a captured frame; takes a copy only when a snapshot is due.
+
+        Args:
+            frame: BGR frame (not kept; copied if used)
+            timestamp: When the frame was grabbed
+        """
+        if not self.enabled or timestamp - self._last_offer_time < self.period:
+            return
+        if self.is_active and not self.is_active():
+            return
+
+        self._last_offer_time = timestamp
+        with self._condition:
+            # If the previous snapshot is still being encoded, this one replaces the wait
+            self._pending = frame.copy()
+            self._condition.notify()
+
+    def _run(self):
+        """Encoding loop."""
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                frame, self._pending = self._pending, None
+
+            try:
+                start_time = time.perf_counter()
+                height, width = frame.shape[:2]
+                if width > self.width:
+                    size = (self.width, round(height * self.width / width))
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                self.last_encode_time = time.perf_counter() - start_time
+                if not ok:
+                    logging.warning("Could not encode camera snapshot")
+                    continue
+
+                self.publish(jpeg.tobytes())
+                self.published += 1
+                logging.debug(f"Published camera snapshot ({len(jpeg)} bytes, "
+                              f"encoded in {self.last_encode_time * 1000:.0f} ms)")
+            except Exception as e:
+                logging.error(f"Error publishing camera snapshot: {e}", exc_info=True)